@@ -0,0 +1,300 @@
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+import java.io.*;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.*;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.*;
+import java.util.Arrays;
+import java.util.Comparator;
+import java.util.concurrent.Semaphore;
+import java.util.stream.Stream;
+
+/**
+ * Long-lived JVM used by api_server.py to compile and run Java code
+ * without paying JVM startup twice (javac + java) on every request.
+ *
+ * Protocol: one request per connection, every field is a big-endian
+ * int length followed by that many UTF-8 bytes.
+ *   greeting: int READY, or int BUSY (then the connection is closed)
+ *   request:  className, source, stdin
+ *   response: int status, stdout, stderr
+ *
+ * Only one program runs at a time (System.in/out/err are JVM-wide), so a
+ * client that gets BUSY compiles and runs the program itself instead of waiting.
+ *
+ * Run with: java CompilerDaemon.java [port]
+ */
+public class CompilerDaemon {
+    static final int OK = 0;
+    static final int RUNTIME_ERROR = 1;
+    static final int COMPILE_ERROR = 2;
+    static final int TIMEOUT = 3;
+    // The program called System.exit(), which also ends this JVM
+    static final int EXITED = 5;
+
+    // Greeting sent on every new connection
+    static final int READY = 0;
+    static final int BUSY = 4;
+
+    static final long RUN_TIMEOUT_MS = 10_000;
+
+    // Most output kept per stream (same limit and marker as api_server.py)
+    static final int MAX_OUTPUT_BYTES = 1_048_576;
+    static final byte[] TRUNCATED_MARKER = "\n[output truncated]".getBytes(StandardCharsets.UTF_8);
+
+    static final PrintStream realOut = System.out;
+    static final PrintStream realErr = System.err;
+    static final InputStream realIn = System.in;
+
+    static final Semaphore idle = new Semaphore(1);
+
+    // The run in progress, answered from the shutdown hook if the program calls System.exit()
+    static DataOutputStream activeOut;
+    static ByteArrayOutputStream activeStdout;
+    static ByteArrayOutputStream activeStderr;
+
+    // Set when the last program left threads behind; they would keep running (and
+    // printing into the next program's output), so the JVM restarts after the reply
+    static volatile boolean restartAfterReply;
+
+    public static void main(String[] args) throws IOException {
+        int port = args.length > 0 ? Integer.parseInt(args[0]) : 5901;
+
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.err.println("No system Java compiler found (running on a JRE instead of a JDK?)");
+            System.exit(1);
+        }
+
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> finish(EXITED), "exit-reply"));
+
+        try (ServerSocket server = new ServerSocket(port, 50, InetAddress.getLoopbackAddress())) {
+            while (true) {
+                Socket client = server.accept();
+                if (!idle.tryAcquire()) {
+                    try (Socket busy = client) {
+                        DataOutputStream out = new DataOutputStream(busy.getOutputStream());
+                        out.writeInt(BUSY);
+                        out.flush();
+                    } catch (IOException e) {
+                        realErr.println("CompilerDaemon request failed: " + e);
+                    }
+                    continue;
+                }
+                new Thread(() -> {
+                    try {
+                        serve(compiler, client);
+                    } finally {
+                        idle.release();
+                    }
+                }, "request").start();
+            }
+        }
+    }
+
+    static void serve(JavaCompiler compiler, Socket socket) {
+        try (Socket client = socket) {
+            DataInputStream in = new DataInputStream(new BufferedInputStream(client.getInputStream()));
+            DataOutputStream out = new DataOutputStream(new BufferedOutputStream(client.getOutputStream()));
+            out.writeInt(READY);
+            out.flush();
+
+            String className = new String(readField(in), StandardCharsets.UTF_8);
+            String source = new String(readField(in), StandardCharsets.UTF_8);
+            byte[] stdin = readField(in);
+
+            int status = handle(compiler, className, source, stdin, out);
+            out.flush();
+
+            if (status == TIMEOUT || restartAfterReply) {
+                // Runaway or leftover user threads cannot be stopped safely, start over with a fresh JVM
+                Runtime.getRuntime().halt(TIMEOUT);
+            }
+        } catch (IOException e) {
+            realErr.println("CompilerDaemon request failed: " + e);
+        } finally {
+            System.setOut(realOut);
+            System.setErr(realErr);
+            System.setIn(realIn);
+        }
+    }
+
+    static int handle(JavaCompiler compiler, String className, String source,
+                      byte[] stdin, DataOutputStream out) throws IOException {
+        Path workDir = Files.createTempDirectory("invitiq_java_");
+        try {
+            Path sourceFile = workDir.resolve(className + ".java");
+            Files.write(sourceFile, source.getBytes(StandardCharsets.UTF_8));
+
+            // Compile in-process
+            ByteArrayOutputStream diagnostics = new CappedOutputStream(false);
+            int rc = compiler.run(null, diagnostics, diagnostics,
+                    "-d", workDir.toString(), sourceFile.toString());
+            if (rc != 0) {
+                reply(out, COMPILE_ERROR, new byte[0], diagnostics.toByteArray());
+                return COMPILE_ERROR;
+            }
+
+            // Run main() in a fresh class loader with redirected stdio
+            ByteArrayOutputStream stdout = new CappedOutputStream(true);
+            ByteArrayOutputStream stderr = new CappedOutputStream(true);
+            System.setIn(new ByteArrayInputStream(stdin));
+            System.setOut(new PrintStream(stdout, true, "UTF-8"));
+            System.setErr(new PrintStream(stderr, true, "UTF-8"));
+            start(out, stdout, stderr);
+
+            int[] status = {OK};
+            // Every thread the program starts joins this group, so none can outlive the run unnoticed
+            ThreadGroup program = new ThreadGroup("program");
+            try (URLClassLoader loader = new URLClassLoader(
+                    new URL[]{workDir.toUri().toURL()}, ClassLoader.getPlatformClassLoader())) {
+                Thread runner = new Thread(program, () -> {
+                    try {
+                        Method main = loader.loadClass(className).getMethod("main", String[].class);
+                        main.invoke(null, (Object) new String[0]);
+                    } catch (InvocationTargetException e) {
+                        status[0] = RUNTIME_ERROR;
+                        if (e.getCause() instanceof OutputLimitExceeded) {
+                            return;
+                        }
+                        System.err.print("Exception in thread \"main\" ");
+                        e.getCause().printStackTrace();
+                    } catch (ReflectiveOperationException e) {
+                        status[0] = RUNTIME_ERROR;
+                        System.err.println("Error: " + e);
+                    }
+                }, "main");
+                runner.start();
+                // Like a normal JVM exit, the run ends when main and all other non-daemon threads have
+                if (!awaitNonDaemonThreads(program, System.currentTimeMillis() + RUN_TIMEOUT_MS)) {
+                    status[0] = TIMEOUT;
+                }
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                status[0] = RUNTIME_ERROR;
+            }
+            // Daemon threads (or threads still running after a timeout) are left over
+            restartAfterReply = liveThreads(program).length > 0;
+
+            finish(status[0]);
+            return status[0];
+        } finally {
+            deleteRecursively(workDir);
+        }
+    }
+
+    static Thread[] liveThreads(ThreadGroup group) {
+        Thread[] threads = new Thread[group.activeCount() + 16];
+        int count = group.enumerate(threads, true);
+        while (count == threads.length) {
+            threads = new Thread[threads.length * 2];
+            count = group.enumerate(threads, true);
+        }
+        return Arrays.stream(threads, 0, count).filter(Thread::isAlive).toArray(Thread[]::new);
+    }
+
+    /** Wait until no non-daemon thread in the group is alive; false if the deadline passes first */
+    static boolean awaitNonDaemonThreads(ThreadGroup group, long deadline) throws InterruptedException {
+        while (true) {
+            Thread pending = Arrays.stream(liveThreads(group)).filter(t -> !t.isDaemon()).findFirst().orElse(null);
+            if (pending == null) {
+                return true;
+            }
+            long left = deadline - System.currentTimeMillis();
+            if (left <= 0) {
+                return false;
+            }
+            pending.join(left);
+        }
+    }
+
+    static synchronized void start(DataOutputStream out, ByteArrayOutputStream stdout, ByteArrayOutputStream stderr) {
+        activeOut = out;
+        activeStdout = stdout;
+        activeStderr = stderr;
+    }
+
+    /** Send the reply for the run in progress, if it has not been sent yet */
+    static synchronized void finish(int status) {
+        if (activeOut == null) {
+            return;
+        }
+        System.out.flush();
+        System.err.flush();
+        try {
+            reply(activeOut, status, activeStdout.toByteArray(), activeStderr.toByteArray());
+            activeOut.flush();
+        } catch (IOException e) {
+            realErr.println("CompilerDaemon reply failed: " + e);
+        }
+        activeOut = null;
+        activeStdout = null;
+        activeStderr = null;
+    }
+
+    /** Thrown into the program when it writes past MAX_OUTPUT_BYTES, stopping a runaway print loop */
+    static class OutputLimitExceeded extends Error {
+        OutputLimitExceeded() {
+            super("output limit exceeded", null, false, false);
+        }
+    }
+
+    /**
+     * ByteArrayOutputStream that keeps at most MAX_OUTPUT_BYTES plus the truncation marker.
+     * With stopWriter, every write past the limit throws OutputLimitExceeded
+     * (an Error, so PrintStream does not swallow it); otherwise the rest is dropped.
+     */
+    static class CappedOutputStream extends ByteArrayOutputStream {
+        final boolean stopWriter;
+        boolean truncated;
+
+        CappedOutputStream(boolean stopWriter) {
+            this.stopWriter = stopWriter;
+        }
+
+        @Override
+        public synchronized void write(int b) {
+            write(new byte[]{(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) {
+            if (!truncated) {
+                int room = MAX_OUTPUT_BYTES - count;
+                if (len <= room) {
+                    super.write(b, off, len);
+                    return;
+                }
+                super.write(b, off, room);
+                super.write(TRUNCATED_MARKER, 0, TRUNCATED_MARKER.length);
+                truncated = true;
+            }
+            if (stopWriter) {
+                throw new OutputLimitExceeded();
+            }
+        }
+    }
+
+    static byte[] readField(DataInputStream in) throws IOException {
+        byte[] data = new byte[in.readInt()];
+        in.readFully(data);
+        return data;
+    }
+
+    static void reply(DataOutputStream out, int status, byte[] stdout, byte[] stderr) throws IOException {
+        out.writeInt(status);
+        out.writeInt(stdout.length);
+        out.write(stdout);
+        out.writeInt(stderr.length);
+        out.write(stderr);
+    }
+
+    static void deleteRecursively(Path dir) {
+        try (Stream<Path> paths = Files.walk(dir)) {
+            paths.sorted(Comparator.reverseOrder()).forEach(p -> p.toFile().delete());
+        } catch (IOException ignored) {
+        }
+    }
+}
@@ -3,10 +3,16 @@ Flask Backend API for AI/ML Compiler
 Provides REST API endpoints for the web frontend
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, g, send_file, abort, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from compiler import AIMLCompiler
+from nlp_corrector import NLPErrorCorrector
+from semantic_cache import SemanticCache
+from request_batcher import MicroBatcher
+import ast
 import json
+import logging
 import sys
 import io
 import subprocess
@@ -14,7 +20,33 @@ import tempfile
 import os
 import traceback
 import re
+import shutil
 import sqlite3
+import socket
+import struct
+import threading
+import time
+import atexit
+import selectors
+import queue
+import hashlib
+import functools
+import copy
+import datetime
+import codecs
+import signal
+import ctypes
+import contextlib
+import contextvars
+import numpy as np
+from cachetools import LRUCache, TTLCache
+
+# Faster JSON encoding for API responses if orjson is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Try to import Google Gemini AI
 try:
@@ -37,12 +69,66 @@ def load_env_file():
 
 load_env_file()
 
+# Request-level diagnostics go through logging; set LOG_LEVEL=DEBUG to see them.
+# getLevelName maps a known level name to its number (anything else to a string);
+# an unknown name falls back to WARNING rather than stopping the server.
+_log_level = logging.getLevelName((os.environ.get('LOG_LEVEL') or 'WARNING').upper())
+logging.basicConfig(level=_log_level if isinstance(_log_level, int) else logging.WARNING)
+log = logging.getLogger(__name__)
+if not isinstance(_log_level, int):
+    log.warning('Unknown LOG_LEVEL %r, using WARNING', os.environ['LOG_LEVEL'])
+
+# Static chatbot instructions, sent once as the model's system instruction
+CHAT_SYSTEM_INSTRUCTION = """You are an expert programming assistant.
+Be concise, clear, and provide practical solutions.
+Provide a helpful, actionable response. If suggesting code changes, use proper formatting."""
+
+GEMINI_MODEL_NAME = 'models/gemini-2.5-flash'
+# Gemini only accepts explicit context caches above a minimum size
+GEMINI_CACHE_MIN_TOKENS = 2048
+GEMINI_CACHE_TTL = datetime.timedelta(minutes=30)
+
+def build_gemini_model():
+    """
+    Create the chat model. When the system instruction is big enough to qualify,
+    it is stored in an explicit Gemini context cache so each call reuses it.
+    Returns (model, cached_content or None).
+    """
+    # Rough estimate (~4 characters per token) to avoid a count_tokens round-trip at startup
+    if len(CHAT_SYSTEM_INSTRUCTION) // 4 < GEMINI_CACHE_MIN_TOKENS:
+        return genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=CHAT_SYSTEM_INSTRUCTION), None
+    
+    cached_content = genai.caching.CachedContent.create(
+        model=GEMINI_MODEL_NAME,
+        system_instruction=CHAT_SYSTEM_INSTRUCTION,
+        ttl=GEMINI_CACHE_TTL
+    )
+    return genai.GenerativeModel.from_cached_content(cached_content=cached_content), cached_content
+
+def refresh_gemini_cache():
+    """
+    Background loop that extends the context cache TTL before it expires
+    """
+    global gemini_model, gemini_cache
+    while True:
+        time.sleep(GEMINI_CACHE_TTL.total_seconds() * 0.8)
+        try:
+            gemini_cache.update(ttl=GEMINI_CACHE_TTL)
+        except Exception as e:
+            print(f"⚠️ Gemini cache refresh failed, recreating it: {e}")
+            try:
+                gemini_model, gemini_cache = build_gemini_model()
+            except Exception as e:
+                print(f"⚠️ Gemini cache recreation failed: {e}")
+
 # Configure Gemini API
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 if GEMINI_AVAILABLE and GEMINI_API_KEY:
     try:
         genai.configure(api_key=GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel('models/gemini-2.5-flash')
+        gemini_model, gemini_cache = build_gemini_model()
+        if gemini_cache is not None:
+            threading.Thread(target=refresh_gemini_cache, daemon=True).start()
         print("✅ Gemini AI enabled for chatbot (gemini-2.5-flash)")
     except Exception as e:
         GEMINI_AVAILABLE = False
@@ -52,6 +138,61 @@ else:
     if not GEMINI_API_KEY:
         print("💡 Set GEMINI_API_KEY environment variable to enable AI chatbot")
 
+# Reuse chatbot answers for near-duplicate prompts
+chat_cache = SemanticCache()
+
+# Exact repeats (e.g. the user retrying a question) are answered from a hash-keyed LRU
+# before the semantic cache has to embed the prompt
+_CHAT_ANSWERS = LRUCache(maxsize=256)
+_CHAT_ANSWERS_LOCK = threading.Lock()
+
+# Questions whose answer depends on when they are asked are never cached
+_TIME_SENSITIVE_RE = re.compile(r'\b(now|today|tonight|yesterday|tomorrow|current(ly)?|latest|recent(ly)?)\b', re.IGNORECASE)
+
+# Questions with numbers in them skip the semantic cache (see _cached_chat_answer)
+_DIGIT_RE = re.compile(r'\d')
+
+def _chat_cache_key(message: str, code: str, language: str):
+    """
+    Key for a chatbot answer, or None if the question should not be answered from cache
+    """
+    if _TIME_SENSITIVE_RE.search(message):
+        return None
+    return hashlib.sha1(f'{language}|{code[:500]}|{message}'.encode('utf-8')).digest()
+
+def _chat_cache_scope(code: str, language: str):
+    """Semantic cache scope: questions only match earlier ones about the same code"""
+    return language, hashlib.sha1(code[:500].encode('utf-8')).digest()
+
+def _cached_chat_answer(cache_key: bytes, message: str, scope: tuple):
+    """
+    Earlier answer for the same (or, with the semantic cache, an equivalent) question.
+    Returns (answer or None, question embedding to hand to _remember_chat_answer).
+    Only the question is embedded: the code context is matched exactly through the
+    scope, and left in the text it would push the question past the model's input limit.
+    """
+    with _CHAT_ANSWERS_LOCK:
+        answer = _CHAT_ANSWERS.get(cache_key)
+    if answer is not None or _DIGIT_RE.search(message):
+        # Questions that differ only by a number ("line 5" vs "line 6") embed almost
+        # identically, so numbered questions are only ever answered from exact matches
+        return answer, None
+    embedding = chat_cache.embed(message)
+    return chat_cache.get(embedding, scope), embedding
+
+def _remember_chat_answer(cache_key: bytes, scope: tuple, embedding, answer: str):
+    with _CHAT_ANSWERS_LOCK:
+        _CHAT_ANSWERS[cache_key] = answer
+    chat_cache.put(embedding, scope, answer)
+
+async def _gemini_generate(prompt: str) -> str:
+    """Single Gemini call, run on the micro-batcher's event loop"""
+    response = await gemini_model.generate_content_async(prompt)
+    return response.text
+
+# Concurrent chat requests are gathered into short batches before hitting Gemini
+chat_batcher = MicroBatcher(_gemini_generate)
+
 # Add compilers to PATH
 gcc_path = r'C:\msys64\mingw64\bin'
 go_path = r'C:\go\bin'
@@ -64,722 +205,1714 @@ for path in [gcc_path, go_path, php_path, nodejs_path, npm_path]:
     if path and path not in os.environ['PATH']:
         os.environ['PATH'] = path + os.pathsep + os.environ['PATH']
 
+# Put ccache in front of gcc/g++ when installed; its cache lives outside the
+# per-run scratch dirs so hits survive across requests and server restarts
+_CCACHE = shutil.which('ccache')
+if _CCACHE:
+    os.environ.setdefault('CCACHE_DIR', os.path.join(tempfile.gettempdir(), 'invitiq_ccache'))
+
+# Environment snapshot for os.posix_spawn, which needs an explicit mapping.
+# subprocess calls deliberately pass no env=: with env=None the child inherits
+# the process environment directly, while an explicit dict is re-encoded per launch.
+_CHILD_ENV = dict(os.environ)
+
 app = Flask(__name__, static_folder='.')
 CORS(app)  # Enable CORS for frontend access
+app.wsgi_app = ProxyFix(app.wsgi_app)  # Trust X-Forwarded-* headers from the hosting proxy
+
+@app.before_request
+def parse_json_payload():
+    """Decode a JSON request body once into g.payload for the API handlers"""
+    g.payload = {}
+    if request.method == 'POST' and request.is_json:
+        try:
+            payload = _json_loads(request.get_data(cache=False) or b'{}')
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return ojson({
+                'success': False,
+                'error': 'Request body must be a JSON object'
+            }, 400)
+        g.payload = payload
+
+def ojson(obj, status: int = 200) -> Response:
+    """
+    JSON response for the API handlers, serialized with orjson when it is available
+    """
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(obj)
+    return Response(body, status=status, mimetype='application/json')
+
+def _json_loads(body: bytes):
+    return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+
+def require_fields(*fields):
+    """
+    Decorator: answer 400 unless every field is present and non-empty in the JSON body
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            for field in fields:
+                if not g.payload.get(field):
+                    return ojson({
+                        'success': False,
+                        'error': f'No {field} provided'
+                    }, 400)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
 
 # Store compiler instances (in production, use proper session management)
 compilers = {}
 
+# Shared NLP helper for the analysis endpoints; they only use its return
+# values, so one instance can serve every request
+_NLP = NLPErrorCorrector()
+
+# R readline() rewrites so scripts can read stdin in non-interactive mode.
+# One pass handles as.integer(readline(...)), as.numeric(readline(...)),
+# character(readline(...)) and standalone readline(...); the closing paren
+# of the wrapper is only consumed when a wrapper was matched.
+_R_READLINE_RE = re.compile(
+    r'(?:(as\.integer|as\.numeric|character)\s*\(\s*)?'
+    r'readline\s*\([^)]*\)'
+    r'(?(1)\s*\))'
+)
+_R_SCAN_STDIN = 'scan("stdin", what=character(), n=1, quiet=TRUE)'
+
+def _r_readline_sub(match) -> str:
+    """Replacement callback for _R_READLINE_RE"""
+    wrapper = match.group(1)
+    if wrapper in ('as.integer', 'as.numeric'):
+        return f'{wrapper}({_R_SCAN_STDIN})'
+    return _R_SCAN_STDIN
+
+# HTML line breaks in PHP output (<br>, <br/>, <br />), matched on the raw output bytes
+_BR_RE = re.compile(rb'<br\s*/?>')
+
+# Reusable scratch directories per language, emptied between runs
+_SCRATCH_DIRS = {lang: queue.Queue(maxsize=8) for lang in ('java', 'c', 'cpp', 'go', 'typescript', 'python', 'php', 'r')}
+
+def borrow_scratch_dir(lang: str) -> str:
+    """
+    Get an empty working directory for a run, reusing a pooled one if available
+    """
+    try:
+        return _SCRATCH_DIRS[lang].get_nowait()
+    except queue.Empty:
+        return tempfile.mkdtemp(prefix=f'invitiq_{lang}_')
+
+def release_scratch_dir(lang: str, path: str):
+    """
+    Empty a working directory and return it to the pool (or delete it if the pool is full)
+    """
+    try:
+        for entry in os.scandir(path):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+        _SCRATCH_DIRS[lang].put_nowait(path)
+    except (OSError, queue.Full):
+        shutil.rmtree(path, ignore_errors=True)
+
+class _DeadlineChecks(ast.NodeTransformer):
+    """
+    Start every except block with a __deadline_check__() call, so user code that
+    catches ExecutionTimeout (e.g. `except BaseException: pass` in a loop) re-raises it
+    """
+    def visit_ExceptHandler(self, node):
+        self.generic_visit(node)
+        check = ast.Expr(ast.Call(ast.Name('__deadline_check__', ast.Load()), [], []))
+        node.body.insert(0, ast.copy_location(check, node.body[0]))
+        return node
+
+@functools.lru_cache(maxsize=256)
+def _compile_py(src_hash: bytes, src: str):
+    """
+    Compile Python source to a code object, cached so re-runs of the same code skip the compiler
+    """
+    tree = _DeadlineChecks().visit(ast.parse(src, '<string>'))
+    return compile(ast.fix_missing_locations(tree), '<string>', 'exec')
+
+# Wall-clock budget for in-process Python execution
+PYTHON_EXEC_TIMEOUT = 5
+
+# Per-context targets for sys.stdout/sys.stderr while in-process Python runs.
+# Server threads run user code concurrently, so the process-wide streams can't be swapped.
+_CAPTURED_STDOUT = contextvars.ContextVar('captured_stdout', default=None)
+_CAPTURED_STDERR = contextvars.ContextVar('captured_stderr', default=None)
+_output_proxy_lock = threading.Lock()
+
+class _ContextStream:
+    """
+    Stand-in for sys.stdout/sys.stderr: writes go to the buffer captured in the
+    current context (see _capture_output), or to the original stream otherwise
+    """
+    def __init__(self, original, target: contextvars.ContextVar):
+        self._original = original
+        self._target = target
+    
+    def _stream(self):
+        return self._target.get() or self._original
+    
+    def write(self, text):
+        return self._stream().write(text)
+    
+    def flush(self):
+        return self._stream().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream(), name)
+
+def _capture_output(stdout: io.StringIO, stderr: io.StringIO):
+    """
+    Send this context's sys.stdout/sys.stderr writes to the given buffers until
+    _release_output is called with the returned tokens
+    """
+    with _output_proxy_lock:
+        if not isinstance(sys.stdout, _ContextStream):
+            sys.stdout = _ContextStream(sys.stdout, _CAPTURED_STDOUT)
+        if not isinstance(sys.stderr, _ContextStream):
+            sys.stderr = _ContextStream(sys.stderr, _CAPTURED_STDERR)
+    return _CAPTURED_STDOUT.set(stdout), _CAPTURED_STDERR.set(stderr)
+
+def _release_output(tokens):
+    stdout_token, stderr_token = tokens
+    _CAPTURED_STDOUT.reset(stdout_token)
+    _CAPTURED_STDERR.reset(stderr_token)
+
+# State of the _deadline block running on each thread
+_deadline_local = threading.local()
+
+class ExecutionTimeout(BaseException):
+    """
+    Raised inside user code that runs past its deadline.
+    Derives from BaseException so a bare `except Exception` in user code can't swallow it,
+    and _compile_py makes every except block re-raise it once the deadline has passed.
+    """
+
+def _deadline_check():
+    """
+    Raise ExecutionTimeout if the current thread's _deadline block has expired
+    """
+    state = getattr(_deadline_local, 'state', None)
+    if state is not None and state['expired']:
+        raise ExecutionTimeout()
+
+@contextlib.contextmanager
+def _deadline(seconds: float):
+    """
+    Interrupt the enclosed block with ExecutionTimeout after `seconds`.
+    On the main thread this uses SIGALRM; on worker threads (Flask/gunicorn) a timer
+    injects the exception with PyThreadState_SetAsyncExc. The injected exception is
+    delivered between bytecodes, so a long blocking C call finishes first.
+    """
+    thread_id = ctypes.c_ulong(threading.get_ident())
+    lock = threading.Lock()
+    state = {'active': True, 'expired': False}
+    outer_state = getattr(_deadline_local, 'state', None)
+    _deadline_local.state = state
+    
+    if threading.current_thread() is threading.main_thread() and hasattr(signal, 'setitimer'):
+        def on_alarm(signum, frame):
+            state['expired'] = True
+            raise ExecutionTimeout()
+        
+        previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+            _deadline_local.state = outer_state
+        return
+    
+    def interrupt():
+        with lock:
+            if state['active']:
+                state['expired'] = True
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, ctypes.py_object(ExecutionTimeout))
+    
+    timer = threading.Timer(seconds, interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.cancel()
+        with lock:
+            state['active'] = False
+            if state['expired']:
+                # Discard the exception if it fired but has not been delivered yet
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, None)
+        _deadline_local.state = outer_state
+
+# Candidate locations for compilers/interpreters, in order of preference
+RSCRIPT_PATHS = [
+    r'C:\Program Files\R\R-4.5.2\bin\Rscript.exe',  # Installed version
+    'Rscript',  # If in PATH
+    r'C:\Program Files\R\R-4.3.2\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.4.0\bin\Rscript.exe',
+    r'C:\Program Files\R\R-4.2.0\bin\Rscript.exe',
+    '/usr/bin/Rscript',  # Linux/Mac
+    '/usr/local/bin/Rscript'
+]
+GCC_PATHS = [
+    'gcc',  # If in PATH
+    r'C:\MinGW\bin\gcc.exe',
+    r'C:\TDM-GCC-64\bin\gcc.exe',
+    r'C:\msys64\mingw64\bin\gcc.exe',
+    '/usr/bin/gcc',  # Linux/Mac
+]
+GPP_PATHS = [
+    'g++',  # If in PATH
+    r'C:\MinGW\bin\g++.exe',
+    r'C:\TDM-GCC-64\bin\g++.exe',
+    r'C:\msys64\mingw64\bin\g++.exe',
+    '/usr/bin/g++',  # Linux/Mac
+]
+
+# Resolved compiler/interpreter paths, keyed by language
+_TOOL_CACHE: dict[str, str] = {}
+
+def resolve_tool(lang: str, candidates: list) -> str:
+    """
+    Find a working compiler/interpreter from a list of candidate paths.
+    The first hit is cached per language so later requests skip the probe.
+    """
+    if lang in _TOOL_CACHE:
+        return _TOOL_CACHE[lang]
+    
+    for path in candidates:
+        # PATH lookup happens in-process, no child process needed
+        if shutil.which(path):
+            _TOOL_CACHE[lang] = path
+            return path
+        
+        try:
+            test_process = subprocess.run(
+                [path, '--version'],
+                capture_output=True,
+                timeout=2
+            )
+            if test_process.returncode == 0:
+                _TOOL_CACHE[lang] = path
+                return path
+        except Exception:
+            continue
+    
+    return None
+
+# Content-addressed cache of compiler output (tsc, gcc/g++, javac), shared by all
+# server workers and kept across restarts
+COMPILE_CACHE_DIR = os.environ.get('INVITIQ_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'invitiq'))
+# Size cap; least recently used entries are deleted once the cache grows past it
+COMPILE_CACHE_MAX_BYTES = int(os.environ.get('INVITIQ_CACHE_MAX_MB', 512)) * 1024 * 1024
+# At most one size check per server process in this many seconds
+COMPILE_CACHE_PRUNE_INTERVAL = 60
+_TOOLCHAIN_IDS = {}
+_compile_cache_pruned_at = float('-inf')
+_compile_cache_prune_lock = threading.Lock()
+
+def _toolchain_id(tool: str) -> str:
+    """
+    Identify a compiler binary by path, size and mtime, so upgrading it invalidates cached output
+    """
+    tool_id = _TOOLCHAIN_IDS.get(tool)
+    if tool_id is None:
+        path = shutil.which(tool) or tool
+        try:
+            st = os.stat(path)
+            tool_id = f'{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}'
+        except OSError:
+            tool_id = tool
+        _TOOLCHAIN_IDS[tool] = tool_id
+    return tool_id
+
+def _compile_cache_path(lang: str, source: str, flags: list) -> str:
+    key = hashlib.sha256('\0'.join([lang, *flags, source]).encode('utf-8')).hexdigest()
+    # Two-character prefix directories keep any one directory small
+    return os.path.join(COMPILE_CACHE_DIR, 'sha256', key[:2], key)
+
+def _compile_cache_get(lang: str, source: str, flags: list):
+    """
+    Directory holding the cached compiler output for this source, or None on a miss
+    """
+    entry = _compile_cache_path(lang, source, flags)
+    try:
+        # The entry's mtime doubles as its last-use time for pruning
+        os.utime(entry)
+    except OSError:
+        return None
+    return entry
+
+def _compile_cache_put(lang: str, source: str, flags: list, build_dir: str, file_names: list):
+    """
+    Copy compiler output from build_dir into the cache and return the entry directory
+    (None if the cache is not writable). The entry is assembled under .tmp/ and renamed
+    into place, so a reader never sees a half-written entry.
+    """
+    entry = _compile_cache_path(lang, source, flags)
+    try:
+        tmp_root = os.path.join(COMPILE_CACHE_DIR, '.tmp')
+        os.makedirs(tmp_root, exist_ok=True)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=tmp_root)
+    except OSError:
+        return None
+    
+    try:
+        for name in file_names:
+            shutil.copy2(os.path.join(build_dir, name), os.path.join(staging, name))
+        os.replace(staging, entry)
+    except OSError:
+        # Usually another worker stored the same entry first
+        shutil.rmtree(staging, ignore_errors=True)
+        return entry if os.path.isdir(entry) else None
+    _schedule_compile_cache_prune()
+    return entry
+
+def _prune_compile_cache():
+    """
+    Delete least recently used cache entries until the cache fits in COMPILE_CACHE_MAX_BYTES.
+    Entries are flat directories, and their mtime is refreshed on every hit.
+    """
+    entries = []
+    total = 0
+    try:
+        for prefix in os.scandir(os.path.join(COMPILE_CACHE_DIR, 'sha256')):
+            for entry in os.scandir(prefix.path):
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+                except OSError:
+                    continue  # Removed by another worker meanwhile
+                total += size
+    except OSError:
+        return
+    
+    entries.sort()
+    for _, size, path in entries:
+        if total <= COMPILE_CACHE_MAX_BYTES:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+def _schedule_compile_cache_prune():
+    """Run _prune_compile_cache in the background, at most once per COMPILE_CACHE_PRUNE_INTERVAL"""
+    global _compile_cache_pruned_at
+    now = time.monotonic()
+    if now - _compile_cache_pruned_at < COMPILE_CACHE_PRUNE_INTERVAL:
+        return
+    if not _compile_cache_prune_lock.acquire(blocking=False):
+        return
+    _compile_cache_pruned_at = now
+    
+    def prune():
+        try:
+            _prune_compile_cache()
+        finally:
+            _compile_cache_prune_lock.release()
+    threading.Thread(target=prune, daemon=True).start()
+
+# Java class name extraction
+_JAVA_PUBCLASS = re.compile(r'public\s+class\s+(\w+)')
+_JAVA_CLASS = re.compile(r'class\s+(\w+)')
+
+# Long-lived JVM that compiles and runs Java code (see CompilerDaemon.java)
+JAVA_DAEMON_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CompilerDaemon.java')
+JAVA_DAEMON_PORT = int(os.environ.get('JAVA_DAEMON_PORT', 5901))
+JAVA_DAEMON_COMPILE_ERROR = 2
+JAVA_DAEMON_TIMEOUT = 3
+JAVA_DAEMON_BUSY = 4
+JAVA_DAEMON_EXITED = 5
+_java_daemon_lock = threading.Lock()
+
+# Most output kept per stream of a program run; a program that writes more is killed
+OUTPUT_MAX_BYTES = 1_048_576
+# Appended to a captured stream that hit its size limit
+OUTPUT_TRUNCATED_MARKER = b'\n[output truncated]'
+
+def _frame(data: bytes) -> bytes:
+    """Length-prefix a field for the Java daemon / TypeScript worker protocol"""
+    return struct.pack('>i', len(data)) + data
+
+def _read_frame(stream, max_bytes: int) -> bytes:
+    """
+    Read one length-prefixed field from the Java daemon or a TypeScript worker.
+    Raises ValueError for a field longer than max_bytes instead of buffering it.
+    """
+    (length,) = struct.unpack('>i', stream.read(4))
+    if length > max_bytes:
+        raise ValueError(f'Reply field of {length} bytes exceeds the {max_bytes} byte limit')
+    data = stream.read(length)
+    if len(data) != length:
+        raise EOFError('Daemon closed the connection')
+    return data
+
+def _stdin_bytes(user_inputs: list, terminator: bytes = b'\n'):
+    """
+    Program input as bytes, one line per user input (None if there are no inputs).
+    Inputs are encoded one by one, so no joined str copy of the whole input is built.
+    """
+    if not user_inputs:
+        return None
+    return b'\n'.join(str(inp).encode('utf-8') for inp in user_inputs) + terminator
+
+def _java_daemon_run(java_path: str, class_name: str, code: str, input_data: bytes = None):
+    """
+    Compile and run Java code inside the persistent JVM daemon.
+    Returns (status, stdout, stderr), or None if the daemon is unavailable or
+    busy with another program, so the caller can fall back to javac + java.
+    """
+    # A daemon may already be listening (e.g. started by another server worker)
+    try:
+        sock = socket.create_connection(('127.0.0.1', JAVA_DAEMON_PORT), timeout=1)
+    except OSError:
+        sock = None
+    
+    if sock is None:
+        # Only one request starts the daemon; the others fall back instead of waiting for it
+        if not _java_daemon_lock.acquire(blocking=False):
+            return None
+        try:
+            daemon = compilers.get('_java_daemon')
+            if daemon is None or daemon.poll() is not None:
+                if not os.path.exists(JAVA_DAEMON_SOURCE):
+                    return None
+                try:
+                    daemon = subprocess.Popen(
+                        [java_path, JAVA_DAEMON_SOURCE, str(JAVA_DAEMON_PORT)],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
+                    )
+                except OSError:
+                    return None
+                compilers['_java_daemon'] = daemon
+            
+            # Wait for the daemon to start listening (only slow on first boot)
+            deadline = time.monotonic() + 10
+            while sock is None:
+                try:
+                    sock = socket.create_connection(('127.0.0.1', JAVA_DAEMON_PORT), timeout=1)
+                except OSError:
+                    if daemon.poll() is not None or time.monotonic() > deadline:
+                        return None
+                    time.sleep(0.1)
+        finally:
+            _java_daemon_lock.release()
+    
+    with sock:
+        try:
+            sock.settimeout(15)
+            reply = sock.makefile('rb')
+            (greeting,) = struct.unpack('>i', reply.read(4))
+            if greeting == JAVA_DAEMON_BUSY:
+                return None
+            sock.sendall(
+                _frame(class_name.encode('utf-8')) +
+                _frame(code.encode('utf-8')) +
+                _frame(input_data or b'')
+            )
+        except (OSError, struct.error):
+            return None
+        
+        # From here on the program may have run, so failures are reported instead of
+        # falling back: running it a second time would repeat its output and side effects
+        try:
+            (status,) = struct.unpack('>i', reply.read(4))
+            # The daemon caps each stream at OUTPUT_MAX_BYTES plus the truncation marker
+            field_limit = OUTPUT_MAX_BYTES + len(OUTPUT_TRUNCATED_MARKER)
+            stdout = _read_frame(reply, field_limit).decode('utf-8', 'replace')
+            stderr = _read_frame(reply, field_limit).decode('utf-8', 'replace')
+            return status, stdout, stderr
+        except socket.timeout:
+            return JAVA_DAEMON_TIMEOUT, '', ''
+        except (OSError, EOFError, ValueError, struct.error):
+            # The JVM went away mid-run without a usable reply
+            return JAVA_DAEMON_EXITED, '', ''
+
+# Platform-specific TypeScript commands (npm installs .cmd shims on Windows, which need the shell)
+_IS_WIN = sys.platform == 'win32'
+_TSNODE = 'ts-node.cmd' if _IS_WIN else 'ts-node'
+_TSC = 'tsc.cmd' if _IS_WIN else 'tsc'
+_SHELL = _IS_WIN
+
+# Long-lived node processes that type-check and run TypeScript (see ts_worker.js)
+TS_WORKER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ts_worker.js')
+# Per server process: gunicorn's -w 4 runs 4 × TS_POOL_SIZE node processes,
+# each holding its own copy of the TypeScript compiler
+TS_POOL_SIZE = int(os.environ.get('TS_POOL_SIZE', 2))
+TS_WORKER_TIMEOUT = 10
+# Budget for a whole worker round trip: type-checking plus the TS_WORKER_TIMEOUT run
+TS_WORKER_REPLY_TIMEOUT = 30
+# The worker caps stdout and stderr at OUTPUT_MAX_BYTES each; JSON escaping can
+# grow a byte to at most 6 (\u001b), plus room for a long compile error
+TS_REPLY_MAX_BYTES = 12 * OUTPUT_MAX_BYTES + 65536
+# Longest source passed to ts-node -e (Linux caps one argument at 128 KiB, UTF-8 is up to 4 bytes/char)
+TS_EVAL_MAX_CHARS = 32_000
+_TS_WORKERS = []
+_TS_IDLE_WORKERS = queue.Queue()
+_TS_POOL_DISABLED = threading.Event()
+_ts_pool_lock = threading.Lock()
+
+# Programs the sandboxed worker cannot run (stdin, timers, async code, modules) go to ts-node
+_TS_POOL_UNSUPPORTED = (
+    'process', 'readline', 'require', 'import ', 'setTimeout', 'setInterval',
+    'setImmediate', 'Promise', 'async ', 'await ', 'fetch(',
+)
+
+def _ts_worker_checkout():
+    """Take an idle TypeScript worker, starting one if the pool is not full yet"""
+    try:
+        return _TS_IDLE_WORKERS.get_nowait()
+    except queue.Empty:
+        pass
+    
+    with _ts_pool_lock:
+        if len(_TS_WORKERS) < TS_POOL_SIZE:
+            if not os.path.exists(TS_WORKER_SOURCE):
+                return None
+            try:
+                worker = subprocess.Popen(
+                    ['node', TS_WORKER_SOURCE],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                return None
+            _TS_WORKERS.append(worker)
+            return worker
+    
+    # Pool is full, wait for a worker to come back
+    try:
+        return _TS_IDLE_WORKERS.get(timeout=30)
+    except queue.Empty:
+        return None
+
+def _ts_worker_discard(worker):
+    with _ts_pool_lock:
+        if worker in _TS_WORKERS:
+            _TS_WORKERS.remove(worker)
+    if worker.poll() is None:
+        worker.kill()
+        worker.wait()
+
+def _ts_pool_run(code: str):
+    """
+    Type-check and run TypeScript inside a pooled node worker.
+    Returns (status, stdout, stderr), or None if the program needs its own
+    node process or no worker is available, so the caller can fall back to ts-node.
+    """
+    if TS_POOL_SIZE <= 0 or _TS_POOL_DISABLED.is_set() or any(marker in code for marker in _TS_POOL_UNSUPPORTED):
+        return None
+    
+    worker = _ts_worker_checkout()
+    if worker is None:
+        return None
+    
+    # A worker stuck past the deadline is killed, which ends the blocking read below
+    timed_out = threading.Event()
+    def expire():
+        timed_out.set()
+        worker.kill()
+    watchdog = threading.Timer(TS_WORKER_REPLY_TIMEOUT, expire)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        request = json.dumps({
+            'code': code,
+            'timeout': TS_WORKER_TIMEOUT * 1000,
+            'maxBytes': OUTPUT_MAX_BYTES,
+        }).encode('utf-8')
+        worker.stdin.write(_frame(request))
+        worker.stdin.flush()
+        reply = json.loads(_read_frame(worker.stdout, TS_REPLY_MAX_BYTES))
+    except (OSError, EOFError, ValueError, struct.error):
+        _ts_worker_discard(worker)
+        if timed_out.is_set():
+            return 'timeout', '', ''
+        return None
+    finally:
+        watchdog.cancel()
+    
+    if reply['status'] == 'unavailable':
+        # No typescript package for node to load, stop trying
+        _TS_POOL_DISABLED.set()
+        _ts_worker_discard(worker)
+        return None
+    
+    _TS_IDLE_WORKERS.put(worker)
+    if reply['status'] == 'fallback':
+        # The sandbox lacks something the program uses, ts-node has it
+        return None
+    return reply['status'], reply['stdout'], reply['stderr']
+
+def _decode(data: bytes) -> str:
+    """
+    Decode captured process output once, tolerating non-UTF-8 bytes
+    """
+    return data.decode('utf-8', 'replace') if data else ''
+
+def _cc_compile_argv(compiler_cmd: str, source_name: str, exe_name: str) -> list:
+    """
+    Build a gcc/g++ command line, routed through ccache when available.
+    Run it with cwd set to the scratch directory: relative file names make
+    identical sources hash the same no matter which scratch directory is used.
+    """
+    argv = [compiler_cmd, source_name, '-o', exe_name]
+    return [_CCACHE] + argv if _CCACHE else argv
+
+def _write_source(path: str, src: str, fd: int = None):
+    """
+    Write source code to a file with raw os-level writes (no buffered text layer).
+    Pass fd to write into an already-open descriptor, e.g. one from tempfile.mkstemp.
+    """
+    data = memoryview(src.encode('utf-8'))
+    if fd is None:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        while data:
+            # writev is POSIX-only; a single-buffer write is equivalent elsewhere
+            written = os.writev(fd, [data]) if hasattr(os, 'writev') else os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+
+def _kill_group(pid: int):
+    """
+    SIGKILL a program started in its own session together with everything it started
+    (e.g. the binary `go run` builds, which holds the output pipes too)
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # Already gone
+
+def _kill_proc(proc: subprocess.Popen):
+    """Kill a _run_capped program, with its process group where there is one"""
+    if _IS_WIN:
+        proc.kill()
+    else:
+        _kill_group(proc.pid)
+
+def _drain(pipe, buf: bytearray, max_bytes: int, proc: subprocess.Popen):
+    """
+    Read a pipe until EOF, keeping at most max_bytes of it.
+    A program that writes more than that is killed, runaway output can't exhaust memory.
+    """
+    with pipe:
+        for chunk in iter(lambda: pipe.read1(65536), b''):
+            if len(buf) > max_bytes:
+                continue  # Already truncated, just let the pipe close
+            room = max_bytes - len(buf)
+            if len(chunk) > room:
+                buf += chunk[:room] + OUTPUT_TRUNCATED_MARKER
+                _kill_proc(proc)
+            else:
+                buf += chunk
+
+def _run_capped(cmd: list, input_data: bytes = None, timeout: float = 30,
+                max_bytes: int = OUTPUT_MAX_BYTES, **popen_kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a program and capture its raw stdout/stderr bytes with subprocess.Popen.
+    Reader threads drain both pipes at once, so a chatty program never stalls
+    on a full pipe. A stream longer than max_bytes is truncated and the program killed.
+    Raises subprocess.TimeoutExpired if the program runs longer than timeout seconds.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        bufsize=65536,
+        stdin=subprocess.PIPE if input_data else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=not _IS_WIN,
+        **popen_kwargs
+    )
+    
+    stdout, stderr = bytearray(), bytearray()
+    threads = [
+        threading.Thread(target=_drain, args=(proc.stdout, stdout, max_bytes, proc), daemon=True),
+        threading.Thread(target=_drain, args=(proc.stderr, stderr, max_bytes, proc), daemon=True),
+    ]
+    if input_data:
+        def feed_stdin():
+            try:
+                with proc.stdin:
+                    proc.stdin.write(input_data)
+            except (BrokenPipeError, OSError):
+                pass  # Program exited without reading all of its input
+        threads.append(threading.Thread(target=feed_stdin, daemon=True))
+    for thread in threads:
+        thread.start()
+    
+    deadline = time.monotonic() + timeout
+    try:
+        proc.wait(timeout=timeout)
+        # Anything the program started may still hold the output pipes open
+        for thread in threads[:2]:
+            thread.join(max(deadline - time.monotonic(), 0))
+        if any(thread.is_alive() for thread in threads[:2]):
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        _kill_proc(proc)
+        proc.wait()
+        raise
+    finally:
+        for thread in threads:
+            thread.join(timeout=1)
+    
+    return subprocess.CompletedProcess(cmd, proc.returncode, bytes(stdout), bytes(stderr))
+
+# Signals the server ignores that a child must get back at their defaults, as
+# subprocess does with restore_signals=True (an ignored SIGPIPE would turn a
+# closed pipe into endless EPIPE errors instead of ending the program)
+_SPAWN_SIGDEF = tuple(getattr(signal, name) for name in ('SIGPIPE', 'SIGXFZ', 'SIGXFSZ') if hasattr(signal, name))
+
+def _spawn_capture(argv: list, input_data: bytes = None, timeout: float = 30,
+                   max_bytes: int = OUTPUT_MAX_BYTES) -> subprocess.CompletedProcess:
+    """
+    Run a program and capture its raw stdout/stderr bytes, like subprocess.run(capture_output=True).
+    Uses os.posix_spawn where available so no fork of the server process is needed.
+    A stream longer than max_bytes is truncated and the program killed.
+    Raises subprocess.TimeoutExpired if the program runs longer than timeout seconds.
+    """
+    if not hasattr(os, 'posix_spawnp'):
+        return _run_capped(argv, input_data, timeout=timeout, max_bytes=max_bytes)
+    
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    try:
+        pid = os.posix_spawnp(argv[0], argv, _CHILD_ENV, file_actions=[
+            (os.POSIX_SPAWN_DUP2, stdin_r, 0),
+            (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+            (os.POSIX_SPAWN_DUP2, stderr_w, 2),
+        ], setsigdef=_SPAWN_SIGDEF, setsid=True)
+    except OSError:
+        for fd in (stdin_w, stdout_r, stderr_r):
+            os.close(fd)
+        raise
+    finally:
+        # Child-side ends are only needed by the child
+        for fd in (stdin_r, stdout_w, stderr_w):
+            os.close(fd)
+    
+    pending = input_data or b''
+    chunks = {stdout_r: [], stderr_r: []}
+    kept = {stdout_r: 0, stderr_r: 0}
+    deadline = time.monotonic() + timeout
+    
+    with selectors.DefaultSelector() as selector:
+        selector.register(stdout_r, selectors.EVENT_READ)
+        selector.register(stderr_r, selectors.EVENT_READ)
+        if pending:
+            os.set_blocking(stdin_w, False)
+            selector.register(stdin_w, selectors.EVENT_WRITE)
+        else:
+            os.close(stdin_w)
+        
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill_group(pid)
+                os.waitpid(pid, 0)
+                for key in list(selector.get_map().values()):
+                    os.close(key.fd)
+                raise subprocess.TimeoutExpired(argv, timeout)
+            
+            for key, _ in selector.select(remaining):
+                if key.fd == stdin_w:
+                    try:
+                        written = os.write(stdin_w, pending)
+                        pending = pending[written:]
+                    except BrokenPipeError:
+                        pending = b''
+                    except BlockingIOError:
+                        continue
+                    if not pending:
+                        selector.unregister(stdin_w)
+                        os.close(stdin_w)
+                else:
+                    data = os.read(key.fd, 65536)
+                    if not data:
+                        selector.unregister(key.fd)
+                        os.close(key.fd)
+                    elif kept[key.fd] <= max_bytes:
+                        room = max_bytes - kept[key.fd]
+                        if len(data) > room:
+                            # Runaway output: keep what fits and stop the program
+                            data = data[:room] + OUTPUT_TRUNCATED_MARKER
+                            _kill_group(pid)
+                        chunks[key.fd].append(data)
+                        kept[key.fd] += len(data)
+    
+    # Both pipes are closed, but the program may still be running (it can close
+    # stdout/stderr itself), so the deadline still applies while waiting for it
+    delay = 0.0005
+    while True:
+        waited, status = os.waitpid(pid, os.WNOHANG)
+        if waited:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _kill_group(pid)
+            os.waitpid(pid, 0)
+            raise subprocess.TimeoutExpired(argv, timeout)
+        delay = min(delay * 2, remaining, 0.05)
+        time.sleep(delay)
+    
+    return subprocess.CompletedProcess(
+        argv,
+        os.waitstatus_to_exitcode(status),
+        b''.join(chunks[stdout_r]),
+        b''.join(chunks[stderr_r])
+    )
+
+@atexit.register
+def _stop_java_daemon():
+    daemon = compilers.get('_java_daemon')
+    if daemon is not None and daemon.poll() is None:
+        daemon.terminate()
+
+@atexit.register
+def _stop_ts_workers():
+    for worker in list(_TS_WORKERS):
+        if worker.poll() is None:
+            worker.terminate()
+
+# Cached execution results for deterministic programs; entries expire so a re-run
+# a minute later reflects any change in the environment (toolchain, files, ...)
+RESULT_CACHE_TTL = 60
+_RESULT_CACHE = TTLCache(maxsize=1024, ttl=RESULT_CACHE_TTL)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# Substrings that suggest a program's output can change between runs
+_NONDETERMINISTIC_MARKERS = (
+    'random', 'rand(', 'time', 'date', 'now(', 'clock', 'uuid',
+    'socket', 'urllib', 'requests', 'http', 'environ', 'getenv',
+    'open(', 'fopen', 'file', 'os.', 'sys.', 'subprocess', 'thread',
+)
+
+def _result_cache_key(code: str, language: str, user_inputs: list = None):
+    """
+    Cache key for an execution result, or None if the program may be nondeterministic
+    """
+    code_lower = code.lower()
+    if any(marker in code_lower for marker in _NONDETERMINISTIC_MARKERS):
+        return None
+    return (
+        language,
+        hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest(),
+        hashlib.blake2b(json.dumps(user_inputs).encode('utf-8'), digest_size=16).digest(),
+    )
+
 def execute_code(code: str, language: str, user_inputs: list = None) -> dict:
     """
-    Execute the compiled code safely and capture output
+    Execute the compiled code safely and capture output.
+    Successful runs of deterministic programs are served from a result cache.
     """
-    result = {
-        'status': 'unknown',
-        'output': '',
-        'errors': []
+    cache_key = _result_cache_key(code, language, user_inputs)
+    if cache_key is not None:
+        with _RESULT_CACHE_LOCK:
+            hit = _RESULT_CACHE.get(cache_key)
+        if hit is not None:
+            return copy.deepcopy(hit)
+    
+    result = _execute_code(code, language, user_inputs)
+    
+    if cache_key is not None and result['status'] == 'success':
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE[cache_key] = copy.deepcopy(result)
+    
+    return result
+
+def _run_python(code: str, user_inputs: list, result: dict) -> dict:
+    """Run Python in-process, with input() fed from user_inputs"""
+    # Capture stdout and stderr for this request only; concurrent runs on other
+    # threads keep writing to their own buffers
+    stdout, stderr = io.StringIO(), io.StringIO()
+    capture_tokens = _capture_output(stdout, stderr)
+    
+    # Use user inputs if provided, otherwise use defaults
+    if user_inputs is None or len(user_inputs) == 0:
+        mock_values = ["5", "10", "test", "hello", "20", "3.14", "yes"]
+    else:
+        mock_values = user_inputs
+    
+    mock_index = [0]  # Use list to make it mutable in nested function
+    
+    # Custom input function that shows prompts and uses mock data
+    def mock_input(prompt=""):
+        # Print the prompt to stdout
+        stdout.write(prompt)
+        
+        # Get mock value
+        if mock_index[0] < len(mock_values):
+            value = mock_values[mock_index[0]]
+            mock_index[0] += 1
+        else:
+            value = "default"
+        
+        # Show the mock value being entered
+        stdout.write(f"{value}\n")
+        return value
+    
+    # Create execution namespace with custom input
+    exec_globals = {
+        '__builtins__': __builtins__,
+        'input': mock_input,
+        '__deadline_check__': _deadline_check,
+        '__name__': '__main__'  # Set __name__ so if __name__ == "__main__" works
     }
     
     try:
-        if language == 'python':
-            # Capture stdout and stderr
-            old_stdout = sys.stdout
-            old_stderr = sys.stderr
+        # Execute the code with custom input
+        code_hash = hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+        with _deadline(PYTHON_EXEC_TIMEOUT):
+            exec(_compile_py(code_hash, code), exec_globals)
+        
+        # Get output
+        output = stdout.getvalue()
+        errors = stderr.getvalue()
+        
+        result['status'] = 'success'
+        result['output'] = output if output else 'Code executed successfully (no output)'
+        
+        if 'input(' in code:
+            if 'warnings' not in result:
+                result['warnings'] = []
+            result['warnings'].append(f'⚠️ Note: Using mock input values (auto-supplied)')
+        
+        if errors:
+            result['errors'].append(errors)
             
-            sys.stdout = io.StringIO()
-            sys.stderr = io.StringIO()
+    except EOFError:
+        result['status'] = 'error'
+        result['errors'].append('EOFError: Program tried to read more input than available.')
+        result['output'] = stdout.getvalue()
+    except ExecutionTimeout:
+        result['status'] = 'error'
+        result['errors'].append(f'⏱️ Execution timeout: Program took too long to execute (>{PYTHON_EXEC_TIMEOUT} seconds).')
+        result['output'] = stdout.getvalue()
+    except Exception as e:
+        result['status'] = 'error'
+        # Extract line number from traceback
+        tb = traceback.extract_tb(e.__traceback__)
+        line_num = None
+        for frame in tb:
+            if frame.filename == '<string>':  # Our executed code
+                line_num = frame.lineno
+                break
+        
+        error_msg = f"{type(e).__name__}: {str(e)}"
+        if line_num:
+            error_msg = f"Line {line_num}: {error_msg}"
+        
+        result['errors'].append(error_msg)
+        # Get any output that was generated before the error
+        partial_output = stdout.getvalue()
+        if partial_output:
+            result['output'] = partial_output
+    finally:
+        _release_output(capture_tokens)
+    
+    return result
+
+def _run_java(code: str, user_inputs: list, result: dict) -> dict:
+    """Compile and run Java in the JVM daemon, falling back to javac + java"""
+    # Execute Java code using subprocess
+    
+    # Java JDK paths
+    JAVA_HOME = r"C:\oracleJdk-25"
+    javac_path = os.path.join(JAVA_HOME, "bin", "javac.exe")
+    java_path = os.path.join(JAVA_HOME, "bin", "java.exe")
+    
+    # Check if JDK is available at the specified path
+    if not os.path.exists(javac_path):
+        result['status'] = 'error'
+        result['errors'].append(
+            f' Java JDK not found at {JAVA_HOME}!\n\n'
+            'Please verify JDK installation or update JAVA_HOME path in api_server.py'
+        )
+        return result
+    
+    try:
+        # Extract PUBLIC class name first (Java requirement: public class must match filename)
+        public_class_match = _JAVA_PUBCLASS.search(code)
+        if public_class_match:
+            class_name = public_class_match.group(1)
+        else:
+            # If no public class, use any class name
+            class_match = _JAVA_CLASS.search(code)
+            class_name = class_match.group(1) if class_match else 'Main'
+        
+        # Prepare input for subprocess if provided
+        input_data = _stdin_bytes(user_inputs)
+        
+        # Fast path: compile and run inside the already-warm JVM daemon
+        daemon_reply = _java_daemon_run(java_path, class_name, code, input_data)
+        if daemon_reply is not None:
+            status, stdout, stderr = daemon_reply
+            if status == JAVA_DAEMON_COMPILE_ERROR:
+                result['status'] = 'error'
+                result['errors'].append(f'☕ Java Compilation Error:\n{stderr}')
+                return result
+            if status == JAVA_DAEMON_TIMEOUT:
+                raise subprocess.TimeoutExpired(java_path, 10)
             
-            # Use user inputs if provided, otherwise use defaults
-            if user_inputs is None or len(user_inputs) == 0:
-                mock_values = ["5", "10", "test", "hello", "20", "3.14", "yes"]
-            else:
-                mock_values = user_inputs
+            if status == JAVA_DAEMON_EXITED:
+                # System.exit() took the daemon down; its exit code is not known
+                result.setdefault('warnings', []).append('⚠️ Note: Program ended with System.exit()')
+                status = 1 if stderr else 0
             
-            mock_index = [0]  # Use list to make it mutable in nested function
+            result['status'] = 'success' if status == 0 else 'error'
+            result['output'] = stdout if stdout else 'Code executed successfully (no output)'
             
-            # Custom input function that shows prompts and uses mock data
-            def mock_input(prompt=""):
-                # Print the prompt to stdout
-                sys.stdout.write(prompt)
-                sys.stdout.flush()
+            if stderr:
+                result['errors'].append(f'⚠️ Runtime Error:\n{stderr}')
+            return result
+        
+        # Fallback: separate javac + java processes
+        # Same source compiled before? Run its cached .class files and skip javac entirely
+        cache_flags = [_toolchain_id(javac_path)]
+        class_dir = _compile_cache_get('java', code, cache_flags)
+        
+        temp_dir = borrow_scratch_dir('java')
+        try:
+            if class_dir is None:
+                # Write Java code to file
+                java_file = os.path.join(temp_dir, f'{class_name}.java')
+                _write_source(java_file, code)
                 
-                # Get mock value
-                if mock_index[0] < len(mock_values):
-                    value = mock_values[mock_index[0]]
-                    mock_index[0] += 1
-                else:
-                    value = "default"
+                # Compile Java code using full path
+                compile_process = _run_capped(
+                    [javac_path, java_file],
+                    timeout=10
+                )
+                
+                if compile_process.returncode != 0:
+                    result['status'] = 'error'
+                    # Parse and format compilation errors
+                    error_output = _decode(compile_process.stderr)
+                    result['errors'].append(f'☕ Java Compilation Error:\n{error_output}')
+                    return result
                 
-                # Show the mock value being entered
-                sys.stdout.write(f"{value}\n")
-                return value
+                # Keep every generated .class (inner classes get their own files)
+                class_files = [name for name in os.listdir(temp_dir) if name.endswith('.class')]
+                class_dir = _compile_cache_put('java', code, cache_flags, temp_dir, class_files) or temp_dir
             
-            # Create execution namespace with custom input
-            exec_globals = {
-                '__builtins__': __builtins__,
-                'input': mock_input,
-                '__name__': '__main__'  # Set __name__ so if __name__ == "__main__" works
-            }
+            # Run Java code using full path
+            run_process = _spawn_capture(
+                [java_path, '-cp', class_dir, class_name],
+                input_data,
+                timeout=10
+            )
             
-            try:
-                # Execute the code with custom input
-                exec(code, exec_globals)
-                
-                # Get output
-                output = sys.stdout.getvalue()
-                errors = sys.stderr.getvalue()
-                
-                result['status'] = 'success'
-                result['output'] = output if output else 'Code executed successfully (no output)'
-                
-                if 'input(' in code:
-                    if 'warnings' not in result:
-                        result['warnings'] = []
-                    result['warnings'].append(f'⚠️ Note: Using mock input values (auto-supplied)')
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            result['output'] = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully (no output)'
+            
+            if run_process.stderr:
+                result['errors'].append(f'⚠️ Runtime Error:\n{_decode(run_process.stderr)}')
+        finally:
+            release_scratch_dir('java', temp_dir)
                 
-                if errors:
-                    result['errors'].append(errors)
-                    
-            except EOFError:
-                result['status'] = 'error'
-                result['errors'].append('EOFError: Program tried to read more input than available.')
-                result['output'] = sys.stdout.getvalue()
-            except Exception as e:
-                result['status'] = 'error'
-                # Extract line number from traceback
-                tb = traceback.extract_tb(e.__traceback__)
-                line_num = None
-                for frame in tb:
-                    if frame.filename == '<string>':  # Our executed code
-                        line_num = frame.lineno
-                        break
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>10 seconds).')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f'❌ Java execution error: {str(e)}')
+    
+    return result
+
+def _split_sql(script: str) -> list:
+    """
+    Split a SQL script into statements. A semicolon only ends a statement where
+    sqlite3.complete_statement agrees, so one inside a string literal stays put.
+    """
+    statements = []
+    pending = ''
+    for piece in script.split(';'):
+        pending += piece + ';'
+        if sqlite3.complete_statement(pending):
+            if pending[:-1].strip():
+                statements.append(pending[:-1].strip())
+            pending = ''
+    # Unterminated literal: keep the rest as one statement so its error is reported
+    if pending[:-1].strip():
+        statements.append(pending[:-1].strip())
+    return statements
+
+def _run_sql(code: str, user_inputs: list, result: dict) -> dict:
+    """Run SQL against a fresh in-memory SQLite database"""
+    # Execute SQL code using SQLite
+    
+    try:
+        # Connect to a throwaway in-memory SQLite database
+        conn = sqlite3.connect(':memory:')
+        
+        try:
+            cursor = conn.cursor()
+            
+            # Remove comments first, then split SQL statements
+            lines = code.split('\n')
+            cleaned_lines = [line for line in lines if not line.strip().startswith('--')]
+            cleaned_code = '\n'.join(cleaned_lines)
+            
+            statements = _split_sql(cleaned_code)
+            
+            output_lines = []
+            executed_as_script = False
+            
+            if 'SELECT' not in cleaned_code.upper():
+                # No result sets to display, so run the whole batch in one transaction
+                try:
+                    conn.executescript(f'BEGIN;\n{cleaned_code}\n;COMMIT;')
+                    output_lines = [f'✓ {statement.split()[0].upper()} executed successfully'
+                                    for statement in statements]
+                    executed_as_script = True
+                except sqlite3.Error:
+                    # A script with its own COMMIT may have kept part of the batch, which
+                    # rollback can't undo; rerun statement by statement on an empty database
+                    conn.close()
+                    conn = sqlite3.connect(':memory:')
+                    cursor = conn.cursor()
+            
+            if not executed_as_script:
+                for statement in statements:
+                    try:
+                        cursor.execute(statement)
+                        
+                        # If it's a SELECT query, fetch and display results
+                        if statement.upper().startswith('SELECT'):
+                            rows = cursor.fetchall()
+                            col_names = [description[0] for description in cursor.description]
+                            
+                            if rows:
+                                # Format as table
+                                output_lines.append('\n' + ' | '.join(col_names))
+                                output_lines.append('-' * (len(' | '.join(col_names))))
+                                for row in rows:
+                                    output_lines.append(' | '.join(str(val) for val in row))
+                                output_lines.append('')  # Empty line for spacing
+                            else:
+                                output_lines.append('Query returned 0 rows.\n')
+                        else:
+                            # For INSERT, UPDATE, DELETE, CREATE, etc.
+                            stmt_type = statement.split()[0].upper()
+                            output_lines.append(f'✓ {stmt_type} executed successfully')
+                        
+                    except sqlite3.Error as e:
+                        result['errors'].append(f'SQL Error in statement:\n  {statement[:100]}\n  {str(e)}')
                 
-                error_msg = f"{type(e).__name__}: {str(e)}"
-                if line_num:
-                    error_msg = f"Line {line_num}: {error_msg}"
+                conn.commit()  # Single commit for the whole batch
+            
+            result['status'] = 'success'
+            result['output'] = '\n'.join(output_lines) if output_lines else 'SQL executed successfully (no output)'
+            
+        finally:
+            conn.close()
                 
-                result['errors'].append(error_msg)
-                # Get any output that was generated before the error
-                partial_output = sys.stdout.getvalue()
-                if partial_output:
-                    result['output'] = partial_output
-            finally:
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f'❌ SQL execution error: {str(e)}')
+    
+    return result
+
+def _run_r(code: str, user_inputs: list, result: dict) -> dict:
+    """Run an R script with Rscript, readline() rewritten to read stdin"""
+    # Execute R code using Rscript
+    
+    try:
+        # Transform readline() calls to work with stdin in non-interactive mode
+        transformed_code = _R_READLINE_RE.sub(_r_readline_sub, code)
         
-        elif language == 'java':
-            # Execute Java code using subprocess
-            
-            # Java JDK paths
-            JAVA_HOME = r"C:\oracleJdk-25"
-            javac_path = os.path.join(JAVA_HOME, "bin", "javac.exe")
-            java_path = os.path.join(JAVA_HOME, "bin", "java.exe")
+        # Create temporary R script file with transformed code
+        r_fd, r_file = tempfile.mkstemp(suffix='.R')
+        _write_source(r_file, transformed_code, fd=r_fd)
+        
+        try:
+            # Try to find Rscript in common locations
+            rscript_cmd = resolve_tool('r', RSCRIPT_PATHS)
             
-            # Check if JDK is available at the specified path
-            if not os.path.exists(javac_path):
+            if not rscript_cmd:
                 result['status'] = 'error'
                 result['errors'].append(
-                    f' Java JDK not found at {JAVA_HOME}!\n\n'
-                    'Please verify JDK installation or update JAVA_HOME path in api_server.py'
+                    '❌ R not found!\n\n'
+                    'Please install R from https://cran.r-project.org/\n'
+                    'Make sure Rscript is in your system PATH.'
                 )
                 return result
             
-            try:
-                # Create temporary directory
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Extract PUBLIC class name first (Java requirement: public class must match filename)
-                    public_class_match = re.search(r'public\s+class\s+(\w+)', code)
-                    if public_class_match:
-                        class_name = public_class_match.group(1)
-                    else:
-                        # If no public class, use any class name
-                        class_match = re.search(r'class\s+(\w+)', code)
-                        class_name = class_match.group(1) if class_match else 'Main'
-                    
-                    # Write Java code to file
-                    java_file = os.path.join(temp_dir, f'{class_name}.java')
-                    with open(java_file, 'w', encoding='utf-8') as f:
-                        f.write(code)
-                    
-                    # Compile Java code using full path
-                    compile_process = subprocess.run(
-                        [javac_path, java_file],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    if compile_process.returncode != 0:
-                        result['status'] = 'error'
-                        # Parse and format compilation errors
-                        error_output = compile_process.stderr
-                        result['errors'].append(f'☕ Java Compilation Error:\n{error_output}')
-                        return result
-                    
-                    # Run Java code using full path
-                    # Prepare input for subprocess if provided
-                    input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                    
-                    run_process = subprocess.run(
-                        [java_path, '-cp', temp_dir, class_name],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    result['output'] = run_process.stdout if run_process.stdout else 'Code executed successfully (no output)'
-                    
-                    if run_process.stderr:
-                        result['errors'].append(f'⚠️ Runtime Error:\n{run_process.stderr}')
-                        
-            except subprocess.TimeoutExpired:
-                result['status'] = 'error'
-                result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>10 seconds).')
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f'❌ Java execution error: {str(e)}')
-        
-        elif language == 'sql':
-            # Execute SQL code using SQLite
+            # Prepare input data for R (if any user inputs)
+            input_data = _stdin_bytes(user_inputs)
             
-            try:
-                # Create temporary database
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.db', delete=False) as temp_db:
-                    db_path = temp_db.name
+            # Run R script with stdin support
+            run_process = _spawn_capture(
+                [rscript_cmd, '--vanilla', '--slave', r_file],
+                input_data,
+                timeout=30
+            )
+            
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            output = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully (no output)'
+            
+            # If there are user inputs, show them clearly
+            if user_inputs and len(user_inputs) > 0:
+                result['output'] = f"📥 User Inputs: {', '.join(str(i) for i in user_inputs[:10])}" + \
+                                 (f" (and {len(user_inputs) - 10} more...)" if len(user_inputs) > 10 else "") + \
+                                 f"\n\n{output}"
+            else:
+                result['output'] = output
+            
+            if run_process.stderr:
+                # Filter out common R warnings that aren't actual errors
+                stderr_lines = _decode(run_process.stderr).split('\n')
+                error_lines = [line for line in stderr_lines if line.strip() and 
+                             not line.startswith('WARNING:') and 
+                             not 'package' in line.lower()]
+                if error_lines:
+                    result['errors'].append(f'⚠️ R Messages:\n' + '\n'.join(error_lines))
                 
-                try:
-                    # Connect to SQLite database
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-                    
-                    # Remove comments first, then split SQL statements
-                    lines = code.split('\n')
-                    cleaned_lines = [line for line in lines if not line.strip().startswith('--')]
-                    cleaned_code = '\n'.join(cleaned_lines)
-                    
-                    # Split SQL statements by semicolon
-                    statements = [stmt.strip() for stmt in cleaned_code.split(';') if stmt.strip()]
-                    
-                    output_lines = []
-                    
-                    for statement in statements:
-                        try:
-                            cursor.execute(statement)
-                            conn.commit()  # Commit after each statement
-                            
-                            # If it's a SELECT query, fetch and display results
-                            if statement.upper().startswith('SELECT'):
-                                rows = cursor.fetchall()
-                                col_names = [description[0] for description in cursor.description]
-                                
-                                if rows:
-                                    # Format as table
-                                    output_lines.append('\n' + ' | '.join(col_names))
-                                    output_lines.append('-' * (len(' | '.join(col_names))))
-                                    for row in rows:
-                                        output_lines.append(' | '.join(str(val) for val in row))
-                                    output_lines.append('')  # Empty line for spacing
-                                else:
-                                    output_lines.append('Query returned 0 rows.\n')
-                            else:
-                                # For INSERT, UPDATE, DELETE, CREATE, etc.
-                                stmt_type = statement.split()[0].upper()
-                                output_lines.append(f'✓ {stmt_type} executed successfully')
-                            
-                        except sqlite3.Error as e:
-                            result['errors'].append(f'SQL Error in statement:\n  {statement[:100]}\n  {str(e)}')
-                    
-                    conn.close()
-                    
-                    result['status'] = 'success'
-                    result['output'] = '\n'.join(output_lines) if output_lines else 'SQL executed successfully (no output)'
-                    
-                finally:
-                    # Clean up temp database
-                    if os.path.exists(db_path):
-                        os.unlink(db_path)
-                        
-            except Exception as e:
+        finally:
+            # Clean up temp file
+            if os.path.exists(r_file):
+                os.unlink(r_file)
+                
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('⏱️ Execution timeout: R script took too long to execute (>30 seconds).')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f'❌ R execution error: {str(e)}')
+    
+    return result
+
+def _run_c(code: str, user_inputs: list, result: dict) -> dict:
+    """Compile C with gcc and run the executable"""
+    # Execute C code using gcc compiler
+    
+    try:
+        # Borrow a scratch directory
+        temp_dir = borrow_scratch_dir('c')
+        try:
+            # Write C code to file
+            c_file = os.path.join(temp_dir, 'program.c')
+            exe_file = os.path.join(temp_dir, 'program.exe')
+            
+            # Try to find gcc compiler
+            gcc_cmd = resolve_tool('c', GCC_PATHS)
+            
+            if not gcc_cmd:
                 result['status'] = 'error'
-                result['errors'].append(f'❌ SQL execution error: {str(e)}')
-        
-        elif language == 'r':
-            # Execute R code using Rscript
+                result['errors'].append(
+                    ' GCC compiler not found!\n\n'
+                    'Please install MinGW-w64 or TDM-GCC:\n'
+                    '• MinGW-w64: https://www.mingw-w64.org/\n'
+                    '• TDM-GCC: https://jmeubank.github.io/tdm-gcc/\n\n'
+                    'Make sure gcc is in your system PATH.'
+                )
+                return result
             
-            try:
-                # Transform readline() calls to work with stdin in non-interactive mode
-                transformed_code = code
+            # Same source compiled before? Run the cached executable
+            cache_flags = [_toolchain_id(gcc_cmd)]
+            cached_build = _compile_cache_get('c', code, cache_flags)
+            if cached_build is not None:
+                exe_file = os.path.join(cached_build, 'program.exe')
+            else:
+                _write_source(c_file, code)
                 
-                # Replace as.integer(readline("prompt"))
-                transformed_code = re.sub(
-                    r'as\.integer\s*\(\s*readline\s*\([^)]*\)\s*\)',
-                    'as.integer(scan("stdin", what=character(), n=1, quiet=TRUE))',
-                    transformed_code
+                # Compile C code
+                compile_process = _run_capped(
+                    _cc_compile_argv(gcc_cmd, 'program.c', 'program.exe'),
+                    timeout=30,
+                    cwd=temp_dir
                 )
                 
-                # Replace as.numeric(readline("prompt"))
-                transformed_code = re.sub(
-                    r'as\.numeric\s*\(\s*readline\s*\([^)]*\)\s*\)',
-                    'as.numeric(scan("stdin", what=character(), n=1, quiet=TRUE))',
-                    transformed_code
-                )
+                if compile_process.returncode != 0:
+                    result['status'] = 'error'
+                    error_output = _decode(compile_process.stderr)
+                    result['errors'].append(f'🔨 C Compilation Error:\n{error_output}')
+                    return result
+                
+                _compile_cache_put('c', code, cache_flags, temp_dir, ['program.exe'])
+            
+            # Run compiled program
+            input_data = _stdin_bytes(user_inputs)
+            
+            run_process = _spawn_capture(
+                [exe_file],
+                input_data,
+                timeout=30
+            )
+            
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            result['output'] = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully (no output)'
+            
+            if run_process.stderr:
+                result['errors'].append(f' Runtime Error:\n{_decode(run_process.stderr)}')
+        finally:
+            release_scratch_dir('c', temp_dir)
                 
-                # Replace character(readline("prompt"))
-                transformed_code = re.sub(
-                    r'character\s*\(\s*readline\s*\([^)]*\)\s*\)',
-                    'scan("stdin", what=character(), n=1, quiet=TRUE)',
-                    transformed_code
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('Execution timeout: Program took too long to execute (>30 seconds).')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f' C execution error: {str(e)}')
+    
+    return result
+
+def _run_cpp(code: str, user_inputs: list, result: dict) -> dict:
+    """Compile C++ with g++ and run the executable"""
+    # Execute C++ code using g++ compiler
+    
+    try:
+        # Borrow a scratch directory
+        temp_dir = borrow_scratch_dir('cpp')
+        try:
+            # Write C++ code to file
+            cpp_file = os.path.join(temp_dir, 'program.cpp')
+            exe_file = os.path.join(temp_dir, 'program.exe')
+            
+            # Try to find g++ compiler
+            gpp_cmd = resolve_tool('cpp', GPP_PATHS)
+            
+            if not gpp_cmd:
+                result['status'] = 'error'
+                result['errors'].append(
+                    ' G++ compiler not found!\n\n'
+                    'Please install MinGW-w64 or TDM-GCC:\n'
+                    '• MinGW-w64: https://www.mingw-w64.org/\n'
+                    '• TDM-GCC: https://jmeubank.github.io/tdm-gcc/\n\n'
+                    'Make sure g++ is in your system PATH.'
                 )
+                return result
+            
+            # Same source compiled before? Run the cached executable
+            cache_flags = [_toolchain_id(gpp_cmd)]
+            cached_build = _compile_cache_get('cpp', code, cache_flags)
+            if cached_build is not None:
+                exe_file = os.path.join(cached_build, 'program.exe')
+            else:
+                _write_source(cpp_file, code)
                 
-                # Replace standalone readline("prompt")
-                transformed_code = re.sub(
-                    r'readline\s*\([^)]*\)',
-                    'scan("stdin", what=character(), n=1, quiet=TRUE)',
-                    transformed_code
+                # Compile C++ code
+                compile_process = _run_capped(
+                    _cc_compile_argv(gpp_cmd, 'program.cpp', 'program.exe'),
+                    timeout=30,
+                    cwd=temp_dir
                 )
                 
-                # Create temporary R script file with transformed code
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.R', delete=False, encoding='utf-8') as temp_r:
-                    temp_r.write(transformed_code)
-                    r_file = temp_r.name
+                if compile_process.returncode != 0:
+                    result['status'] = 'error'
+                    error_output = _decode(compile_process.stderr)
+                    result['errors'].append(f'🔨 C++ Compilation Error:\n{error_output}')
+                    return result
                 
-                try:
-                    # Try to find Rscript in common locations
-                    rscript_paths = [
-                        r'C:\Program Files\R\R-4.5.2\bin\Rscript.exe',  # Installed version
-                        'Rscript',  # If in PATH
-                        r'C:\Program Files\R\R-4.3.2\bin\Rscript.exe',
-                        r'C:\Program Files\R\R-4.4.0\bin\Rscript.exe',
-                        r'C:\Program Files\R\R-4.2.0\bin\Rscript.exe',
-                        '/usr/bin/Rscript',  # Linux/Mac
-                        '/usr/local/bin/Rscript'
-                    ]
-                    
-                    rscript_cmd = None
-                    for path in rscript_paths:
-                        try:
-                            test_process = subprocess.run(
-                                [path, '--version'],
-                                capture_output=True,
-                                timeout=2
-                            )
-                            if test_process.returncode == 0:
-                                rscript_cmd = path
-                                break
-                        except:
-                            continue
-                    
-                    if not rscript_cmd:
-                        result['status'] = 'error'
-                        result['errors'].append(
-                            '❌ R not found!\n\n'
-                            'Please install R from https://cran.r-project.org/\n'
-                            'Make sure Rscript is in your system PATH.'
-                        )
-                        return result
-                    
-                    # Prepare input data for R (if any user inputs)
-                    input_data = None
-                    if user_inputs and len(user_inputs) > 0:
-                        input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n'
-                    
-                    # Run R script with stdin support
-                    run_process = subprocess.run(
-                        [rscript_cmd, '--vanilla', '--slave', r_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    output = run_process.stdout if run_process.stdout else 'Code executed successfully (no output)'
-                    
-                    # If there are user inputs, show them clearly
-                    if user_inputs and len(user_inputs) > 0:
-                        result['output'] = f"📥 User Inputs: {', '.join(str(i) for i in user_inputs[:10])}" + \
-                                         (f" (and {len(user_inputs) - 10} more...)" if len(user_inputs) > 10 else "") + \
-                                         f"\n\n{output}"
-                    else:
-                        result['output'] = output
-                    
-                    if run_process.stderr:
-                        # Filter out common R warnings that aren't actual errors
-                        stderr_lines = run_process.stderr.split('\n')
-                        error_lines = [line for line in stderr_lines if line.strip() and 
-                                     not line.startswith('WARNING:') and 
-                                     not 'package' in line.lower()]
-                        if error_lines:
-                            result['errors'].append(f'⚠️ R Messages:\n' + '\n'.join(error_lines))
-                        
-                finally:
-                    # Clean up temp file
-                    if os.path.exists(r_file):
-                        os.unlink(r_file)
-                        
-            except subprocess.TimeoutExpired:
-                result['status'] = 'error'
-                result['errors'].append('⏱️ Execution timeout: R script took too long to execute (>30 seconds).')
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f'❌ R execution error: {str(e)}')
-        
-        elif language == 'c':
-            # Execute C code using gcc compiler
+                _compile_cache_put('cpp', code, cache_flags, temp_dir, ['program.exe'])
             
-            try:
-                # Create temporary directory
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Write C code to file
-                    c_file = os.path.join(temp_dir, 'program.c')
-                    exe_file = os.path.join(temp_dir, 'program.exe')
-                    
-                    with open(c_file, 'w', encoding='utf-8') as f:
-                        f.write(code)
-                    
-                    # Try to find gcc compiler
-                    gcc_paths = [
-                        'gcc',  # If in PATH
-                        r'C:\MinGW\bin\gcc.exe',
-                        r'C:\TDM-GCC-64\bin\gcc.exe',
-                        r'C:\msys64\mingw64\bin\gcc.exe',
-                        '/usr/bin/gcc',  # Linux/Mac
-                    ]
-                    
-                    gcc_cmd = None
-                    for path in gcc_paths:
-                        try:
-                            test_process = subprocess.run(
-                                [path, '--version'],
-                                capture_output=True,
-                                timeout=2
-                            )
-                            if test_process.returncode == 0:
-                                gcc_cmd = path
-                                break
-                        except:
-                            continue
-                    
-                    if not gcc_cmd:
-                        result['status'] = 'error'
-                        result['errors'].append(
-                            ' GCC compiler not found!\n\n'
-                            'Please install MinGW-w64 or TDM-GCC:\n'
-                            '• MinGW-w64: https://www.mingw-w64.org/\n'
-                            '• TDM-GCC: https://jmeubank.github.io/tdm-gcc/\n\n'
-                            'Make sure gcc is in your system PATH.'
-                        )
-                        return result
-                    
-                    # Compile C code
-                    compile_process = subprocess.run(
-                        [gcc_cmd, c_file, '-o', exe_file],
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    if compile_process.returncode != 0:
-                        result['status'] = 'error'
-                        error_output = compile_process.stderr
-                        result['errors'].append(f'🔨 C Compilation Error:\n{error_output}')
-                        return result
-                    
-                    # Run compiled program
-                    input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                    
-                    run_process = subprocess.run(
-                        [exe_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    result['output'] = run_process.stdout if run_process.stdout else 'Code executed successfully (no output)'
-                    
-                    if run_process.stderr:
-                        result['errors'].append(f' Runtime Error:\n{run_process.stderr}')
-                        
-            except subprocess.TimeoutExpired:
-                result['status'] = 'error'
-                result['errors'].append('Execution timeout: Program took too long to execute (>30 seconds).')
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f' C execution error: {str(e)}')
+            # Run compiled program
+            input_data = _stdin_bytes(user_inputs)
+            
+            run_process = _spawn_capture(
+                [exe_file],
+                input_data,
+                timeout=30
+            )
+            
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            result['output'] = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully (no output)'
+            
+            if run_process.stderr:
+                result['errors'].append(f'⚠️ Runtime Error:\n{_decode(run_process.stderr)}')
+        finally:
+            release_scratch_dir('cpp', temp_dir)
                 
-        elif language == 'cpp':
-            # Execute C++ code using g++ compiler
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>30 seconds).')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f' C++ execution error: {str(e)}')
+    
+    return result
+
+def _run_go(code: str, user_inputs: list, result: dict) -> dict:
+    """Run Go code with go run"""
+    # Execute Go code
+    
+    try:
+        temp_dir = borrow_scratch_dir('go')
+        try:
+            go_file = os.path.join(temp_dir, 'main.go')
+            _write_source(go_file, code)
             
-            try:
-                # Create temporary directory
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Write C++ code to file
-                    cpp_file = os.path.join(temp_dir, 'program.cpp')
-                    exe_file = os.path.join(temp_dir, 'program.exe')
-                    
-                    with open(cpp_file, 'w', encoding='utf-8') as f:
-                        f.write(code)
-                    
-                    # Try to find g++ compiler
-                    gpp_paths = [
-                        'g++',  # If in PATH
-                        r'C:\MinGW\bin\g++.exe',
-                        r'C:\TDM-GCC-64\bin\g++.exe',
-                        r'C:\msys64\mingw64\bin\g++.exe',
-                        '/usr/bin/g++',  # Linux/Mac
-                    ]
-                    
-                    gpp_cmd = None
-                    for path in gpp_paths:
-                        try:
-                            test_process = subprocess.run(
-                                [path, '--version'],
-                                capture_output=True,
-                                timeout=2
-                            )
-                            if test_process.returncode == 0:
-                                gpp_cmd = path
-                                break
-                        except:
-                            continue
-                    
-                    if not gpp_cmd:
-                        result['status'] = 'error'
-                        result['errors'].append(
-                            ' G++ compiler not found!\n\n'
-                            'Please install MinGW-w64 or TDM-GCC:\n'
-                            '• MinGW-w64: https://www.mingw-w64.org/\n'
-                            '• TDM-GCC: https://jmeubank.github.io/tdm-gcc/\n\n'
-                            'Make sure g++ is in your system PATH.'
-                        )
-                        return result
-                    
-                    # Compile C++ code
-                    compile_process = subprocess.run(
-                        [gpp_cmd, cpp_file, '-o', exe_file],
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    if compile_process.returncode != 0:
-                        result['status'] = 'error'
-                        error_output = compile_process.stderr
-                        result['errors'].append(f'🔨 C++ Compilation Error:\n{error_output}')
-                        return result
-                    
-                    # Run compiled program
-                    input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                    
-                    run_process = subprocess.run(
-                        [exe_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    result['output'] = run_process.stdout if run_process.stdout else 'Code executed successfully (no output)'
-                    
-                    if run_process.stderr:
-                        result['errors'].append(f'⚠️ Runtime Error:\n{run_process.stderr}')
-                        
-            except subprocess.TimeoutExpired:
-                result['status'] = 'error'
-                result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>30 seconds).')
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f' C++ execution error: {str(e)}')
-        
-        elif language == 'go':
-            # Execute Go code
+            # Run Go code with proper input formatting
+            # Add extra newlines for better visibility
+            input_data = _stdin_bytes(user_inputs, terminator=b'\n\n')
             
-            try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    go_file = os.path.join(temp_dir, 'main.go')
-                    with open(go_file, 'w', encoding='utf-8') as f:
-                        f.write(code)
-                    
-                    # Run Go code with proper input formatting
-                    if user_inputs and len(user_inputs) > 0:
-                        # Add extra newlines for better visibility
-                        input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n\n'
-                    else:
-                        input_data = None
-                    
-                    run_process = subprocess.run(
-                        ['go', 'run', go_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    
-                    # Clean up output - replace multiple spaces with newlines for better readability
-                    output = run_process.stdout if run_process.stdout else 'Code executed successfully'
-                    
-                    # If there are user inputs, show them clearly
-                    if user_inputs and len(user_inputs) > 0:
-                        result['output'] = f"📥 User Inputs: {', '.join(str(i) for i in user_inputs[:10])}" + \
-                                         (f" (and {len(user_inputs) - 10} more...)" if len(user_inputs) > 10 else "") + \
-                                         f"\n\n{output}"
-                    else:
-                        result['output'] = output
-                    
-                    if run_process.stderr:
-                        result['errors'].append(f'⚠️ Error:\n{run_process.stderr}')
-            except FileNotFoundError:
-                result['status'] = 'error'
-                result['errors'].append(' Go not found! Install from https://go.dev/dl/')
-            except Exception as e:
+            run_process = _spawn_capture(
+                ['go', 'run', go_file],
+                input_data,
+                timeout=30
+            )
+            
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            
+            # Clean up output - replace multiple spaces with newlines for better readability
+            output = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully'
+            
+            # If there are user inputs, show them clearly
+            if user_inputs and len(user_inputs) > 0:
+                result['output'] = f"📥 User Inputs: {', '.join(str(i) for i in user_inputs[:10])}" + \
+                                 (f" (and {len(user_inputs) - 10} more...)" if len(user_inputs) > 10 else "") + \
+                                 f"\n\n{output}"
+            else:
+                result['output'] = output
+            
+            if run_process.stderr:
+                result['errors'].append(f'⚠️ Error:\n{_decode(run_process.stderr)}')
+        finally:
+            release_scratch_dir('go', temp_dir)
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>30 seconds).')
+    except FileNotFoundError:
+        result['status'] = 'error'
+        result['errors'].append(' Go not found! Install from https://go.dev/dl/')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f' Go execution error: {str(e)}')
+    
+    return result
+
+def _run_php(code: str, user_inputs: list, result: dict) -> dict:
+    """Run PHP code with the php interpreter"""
+    # Execute PHP code
+    
+    try:
+        php_file = None
+        try:
+            if user_inputs:
+                # stdin is taken by the program's input, so the script goes in a file
+                php_fd, php_file = tempfile.mkstemp(suffix='.php')
+                _write_source(php_file, code, fd=php_fd)
+                input_data = _stdin_bytes(user_inputs)
+                run_process = _spawn_capture(
+                    ['php', php_file],
+                    input_data,
+                    timeout=30
+                )
+            else:
+                # php reads the script from stdin when given no file
+                run_process = _spawn_capture(['php'], code.encode('utf-8'), timeout=30)
+            
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            # Convert HTML line breaks to actual line breaks for console display
+            output = _decode(_BR_RE.sub(b'\n', run_process.stdout)) if run_process.stdout else 'Code executed successfully'
+            result['output'] = output
+            if run_process.stderr:
+                result['errors'].append(f'⚠️ Error:\n{_decode(run_process.stderr)}')
+        finally:
+            if php_file and os.path.exists(php_file):
+                os.unlink(php_file)
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['errors'].append('⏱️ Execution timeout: Program took too long to execute (>30 seconds).')
+    except FileNotFoundError:
+        result['status'] = 'error'
+        result['errors'].append(' PHP not found! Install from https://www.php.net/downloads')
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f' PHP execution error: {str(e)}')
+    
+    return result
+
+def _run_ts(code: str, user_inputs: list, result: dict) -> dict:
+    """Run TypeScript in a pooled node worker, falling back to ts-node or tsc + node"""
+    # Execute TypeScript code
+    
+    try:
+        # Fast path: type-check and run inside an already-warm node worker
+        pooled = _ts_pool_run(code)
+        if pooled is not None:
+            status, stdout, stderr = pooled
+            if status == 'compile_error':
                 result['status'] = 'error'
-                result['errors'].append(f' Go execution error: {str(e)}')
+                result['errors'].append(f'🔨 TypeScript Compilation Error:\n{stderr.strip()}')
+                return result
+            if status == 'timeout':
+                raise subprocess.TimeoutExpired('node', TS_WORKER_TIMEOUT)
+            
+            result['status'] = 'success' if status == 'ok' else 'error'
+            result['output'] = stdout if stdout else 'Code executed successfully'
+            if stderr:
+                label = 'Warnings' if status == 'ok' else 'Runtime Error'
+                result['errors'].append(f'⚠️ {label}:\n{stderr}')
+            return result
         
-        elif language == 'php':
-            # Execute PHP code
+        temp_dir = borrow_scratch_dir('typescript')
+        try:
+            ts_file = os.path.join(temp_dir, 'program.ts')
+            js_file = os.path.join(temp_dir, 'program.js')
             
-            try:
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.php', delete=False, encoding='utf-8') as temp_php:
-                    temp_php.write(code)
-                    php_file = temp_php.name
+            # Compiled this source before? Skip ts-node and tsc, run the cached JavaScript
+            cache_flags = [_toolchain_id(_TSC), '--module', 'commonjs']
+            cached_build = _compile_cache_get('typescript', code, cache_flags)
+            if cached_build is not None:
+                js_file = os.path.join(cached_build, 'program.js')
+            else:
+                # Small programs go to ts-node inline with -e, so no source file is written
+                # (Windows runs ts-node through the shell, which would mangle the code)
+                eval_inline = not _IS_WIN and len(code) <= TS_EVAL_MAX_CHARS
+                if not eval_inline:
+                    _write_source(ts_file, code)
                 
+                # Try ts-node first (simpler, runs TypeScript directly)
                 try:
-                    input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                    run_process = subprocess.run(
-                        ['php', php_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    # Convert HTML line breaks to actual line breaks for console display
-                    output = run_process.stdout if run_process.stdout else 'Code executed successfully'
-                    output = output.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                    result['output'] = output
-                    if run_process.stderr:
-                        result['errors'].append(f'⚠️ Error:\n{run_process.stderr}')
-                finally:
-                    if os.path.exists(php_file):
-                        os.unlink(php_file)
-            except FileNotFoundError:
-                result['status'] = 'error'
-                result['errors'].append(' PHP not found! Install from https://www.php.net/downloads')
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f' PHP execution error: {str(e)}')
-        
-        elif language == 'typescript':
-            # Execute TypeScript code
-            
-            try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    ts_file = os.path.join(temp_dir, 'program.ts')
-                    js_file = os.path.join(temp_dir, 'program.js')
-                    
-                    with open(ts_file, 'w', encoding='utf-8') as f:
-                        f.write(code)
-                    
-                    # Try ts-node first (simpler, runs TypeScript directly)
-                    try:
-                        input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                        ts_node_cmd = 'ts-node.cmd' if sys.platform == 'win32' else 'ts-node'
-                        run_process = subprocess.run(
-                            [ts_node_cmd, ts_file],
-                            input=input_data,
-                            capture_output=True,
-                            text=True,
-                            timeout=30,
-                            shell=True if sys.platform == 'win32' else False
-                        )
-
-                        if run_process.returncode == 0:
-                            result['status'] = 'success'
-                            result['output'] = run_process.stdout if run_process.stdout else 'Code executed successfully'
-                            if run_process.stderr:
-                                result['errors'].append(f'⚠️ Warnings:\n{run_process.stderr}')
-                            return result
-                    except FileNotFoundError:
-                        pass  # ts-node not found, try tsc instead
-                    
-                    # Fallback to tsc + node
-                    tsc_cmd = 'tsc.cmd' if sys.platform == 'win32' else 'tsc'
-                    compile_process = subprocess.run(
-                        [tsc_cmd, ts_file, '--outFile', js_file, '--module', 'commonjs'],
-                        capture_output=True,
-                        text=True,
+                    input_data = _stdin_bytes(user_inputs)
+                    run_process = _run_capped(
+                        [_TSNODE, '-e', code] if eval_inline else [_TSNODE, ts_file],
+                        input_data,
                         timeout=30,
-                        shell=True if sys.platform == 'win32' else False
+                        shell=_SHELL
                     )
-                    
-                    if compile_process.returncode != 0:
-                        result['status'] = 'error'
-                        stderr = compile_process.stderr.strip()
-                        if stderr:
-                            result['errors'].append(f'🔨 TypeScript Compilation Error:\n{stderr}')
-                        else:
-                            result['errors'].append('🔨 TypeScript Compilation Error: tsc command failed')
-                        result['errors'].append(
-                            '\n💡 Install TypeScript:\n'
-                            '   npm install -g typescript\n'
-                            '   OR\n'
-                            '   npm install -g ts-node (recommended for faster execution)'
-                        )
-                        return result
-                    
-                    # Check if JS file was created
-                    if not os.path.exists(js_file):
-                        result['status'] = 'error'
-                        result['errors'].append('🔨 TypeScript compilation did not generate output file')
+
+                    if run_process.returncode == 0:
+                        result['status'] = 'success'
+                        result['output'] = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully'
+                        if run_process.stderr:
+                            result['errors'].append(f'⚠️ Warnings:\n{_decode(run_process.stderr)}')
                         return result
-                    
-                    # Run compiled JavaScript
-                    input_data = '\n'.join(str(inp) for inp in user_inputs) + '\n' if user_inputs else None
-                    run_process = subprocess.run(
-                        ['node', js_file],
-                        input=input_data,
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    
-                    result['status'] = 'success' if run_process.returncode == 0 else 'error'
-                    result['output'] = run_process.stdout if run_process.stdout else 'Code executed successfully'
-                    if run_process.stderr:
-                        result['errors'].append(f'⚠️ Runtime Error:\n{run_process.stderr}')
-            except FileNotFoundError as e:
-                result['status'] = 'error'
-                result['errors'].append(
-                    '❌ TypeScript/Node.js not found!\n\n'
-                    '📦 Installation Required:\n'
-                    '1. Install Node.js: https://nodejs.org/\n'
-                    '2. Install TypeScript: npm install -g typescript\n'
-                    '3. OR Install ts-node: npm install -g ts-node (recommended)\n\n'
-                    f'Missing command: {str(e)}'
+                except FileNotFoundError:
+                    pass  # ts-node not found, try tsc instead
+                
+                # Fallback to tsc + node
+                if eval_inline:
+                    _write_source(ts_file, code)
+                compile_process = _run_capped(
+                    [_TSC, ts_file, '--outFile', js_file, '--module', 'commonjs'],
+                    timeout=30,
+                    shell=_SHELL
                 )
-            except Exception as e:
-                result['status'] = 'error'
-                result['errors'].append(f' TypeScript execution error: {str(e)}')
+                
+                if compile_process.returncode != 0:
+                    result['status'] = 'error'
+                    stderr = _decode(compile_process.stderr).strip()
+                    if stderr:
+                        result['errors'].append(f'🔨 TypeScript Compilation Error:\n{stderr}')
+                    else:
+                        result['errors'].append('🔨 TypeScript Compilation Error: tsc command failed')
+                    result['errors'].append(
+                        '\n💡 Install TypeScript:\n'
+                        '   npm install -g typescript\n'
+                        '   OR\n'
+                        '   npm install -g ts-node (recommended for faster execution)'
+                    )
+                    return result
+                
+                # Check if JS file was created
+                if not os.path.exists(js_file):
+                    result['status'] = 'error'
+                    result['errors'].append('🔨 TypeScript compilation did not generate output file')
+                    return result
+                
+                _compile_cache_put('typescript', code, cache_flags, temp_dir, ['program.js'])
             
-        else:
-            result['status'] = 'unknown_language'
-            result['output'] = f'Execution not supported for {language}'
+            # Run compiled JavaScript
+            input_data = _stdin_bytes(user_inputs)
+            run_process = _spawn_capture(
+                ['node', js_file],
+                input_data,
+                timeout=30
+            )
             
+            result['status'] = 'success' if run_process.returncode == 0 else 'error'
+            result['output'] = _decode(run_process.stdout) if run_process.stdout else 'Code executed successfully'
+            if run_process.stderr:
+                result['errors'].append(f'⚠️ Runtime Error:\n{_decode(run_process.stderr)}')
+        finally:
+            release_scratch_dir('typescript', temp_dir)
+    except subprocess.TimeoutExpired as e:
+        result['status'] = 'error'
+        result['errors'].append(f'⏱️ Execution timeout: Program took too long to execute (>{e.timeout} seconds).')
+    except FileNotFoundError as e:
+        result['status'] = 'error'
+        result['errors'].append(
+            '❌ TypeScript/Node.js not found!\n\n'
+            '📦 Installation Required:\n'
+            '1. Install Node.js: https://nodejs.org/\n'
+            '2. Install TypeScript: npm install -g typescript\n'
+            '3. OR Install ts-node: npm install -g ts-node (recommended)\n\n'
+            f'Missing command: {str(e)}'
+        )
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f' TypeScript execution error: {str(e)}')
+    
+    return result
+
+# Per-language runners for _execute_code; each fills in and returns the result dict
+_LANG_RUNNERS = {
+    'python': _run_python,
+    'java': _run_java,
+    'sql': _run_sql,
+    'r': _run_r,
+    'c': _run_c,
+    'cpp': _run_cpp,
+    'go': _run_go,
+    'php': _run_php,
+    'typescript': _run_ts,
+}
+
+def _execute_code(code: str, language: str, user_inputs: list = None) -> dict:
+    """
+    Execute the compiled code safely and capture output
+    """
+    result = {
+        'status': 'unknown',
+        'output': '',
+        'errors': []
+    }
+    
+    runner = _LANG_RUNNERS.get(language)
+    if runner is None:
+        result['status'] = 'unknown_language'
+        result['output'] = f'Execution not supported for {language}'
+        return result
+    
+    try:
+        runner(code, user_inputs, result)
     except Exception as e:
         result['status'] = 'error'
         result['errors'].append(f'Execution error: {str(e)}')
     
     return result
 
+# Languages /api/compile executes directly (only Python goes through AIMLCompiler),
+# with the explanation shown for each
+DIRECT_EXECUTION_EXPLANATIONS = {
+    'java': '=== Java Execution ===\nCode compiled and executed using Oracle JDK 25',
+    'sql': '=== SQL Execution ===\nSQL queries executed using SQLite3',
+    'r': '=== R Execution ===\nR code executed using Rscript',
+    'c': '=== C Execution ===\nC code compiled and executed using GCC',
+    'cpp': '=== C++ Execution ===\nC++ code compiled and executed using G++',
+    'go': '=== Go Execution ===\nGo code executed using go run',
+    'php': '=== PHP Execution ===\nPHP code executed using php interpreter',
+    'typescript': '=== TypeScript Execution ===\nTypeScript compiled and executed using tsc + node',
+}
+
 @app.route('/api/compile', methods=['POST'])
+@require_fields('code')
 def compile_code():
     """
     Compile code with AI/ML enhancements
@@ -792,89 +1925,21 @@ def compile_code():
     }
     """
     try:
-        data = request.get_json()
+        data = g.payload
         source_code = data.get('code', '')
         language = data.get('language', 'python')
         auto_detect = data.get('auto_detect', True)
         user_inputs = data.get('inputs', [])  # Get user inputs
         
-        if not source_code:
-            return jsonify({
-                'success': False,
-                'error': 'No code provided'
-            }), 400
-        
-        # For Java, SQL, and R skip the compiler and execute directly
-        if language == 'java':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== Java Execution ===\nCode compiled and executed using Oracle JDK 25'
-            })
-        
-        if language == 'sql':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== SQL Execution ===\nSQL queries executed using SQLite3'
-            })
-        
-        if language == 'r':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== R Execution ===\nR code executed using Rscript'
-            })
-        
-        if language == 'c':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== C Execution ===\nC code compiled and executed using GCC'
-            })
-        
-        if language == 'cpp':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== C++ Execution ===\nC++ code compiled and executed using G++'
-            })
-        
-        if language == 'go':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== Go Execution ===\nGo code executed using go run'
-            })
-        
-        if language == 'php':
+        # Every language except Python skips the compiler and executes directly
+        explanation = DIRECT_EXECUTION_EXPLANATIONS.get(language)
+        if explanation is not None:
             execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")
-            return jsonify({
+            log.debug("Execution result for %s: %s", language, execution_result)
+            return ojson({
                 'success': True,
                 'execution': execution_result,
-                'explanation': '=== PHP Execution ===\nPHP code executed using php interpreter'
-            })
-        
-        if language == 'typescript':
-            execution_result = execute_code(source_code, language, user_inputs)
-            print(f"✅ Execution result for {language}: {execution_result}")
-            return jsonify({
-                'success': True,
-                'execution': execution_result,
-                'explanation': '=== TypeScript Execution ===\nTypeScript compiled and executed using tsc + node'
+                'explanation': explanation
             })
         
         # Create compiler instance for Python
@@ -892,17 +1957,207 @@ def compile_code():
             code_to_execute = source_code  # Use original code
             execution_result = execute_code(code_to_execute, language, user_inputs)
             result['execution'] = execution_result
-            print(f"✅ Execution result for {language}: {execution_result}")  # Debug log
+            log.debug("Execution result for %s: %s", language, execution_result)
         
-        return jsonify(result)
+        return ojson(result)
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+# Languages /api/run-stream can launch as a child process
+STREAM_LANGUAGES = ('python', 'c', 'cpp', 'go', 'php', 'r', 'typescript')
+
+def _stream_event(event: str, **fields) -> str:
+    """One NDJSON line for /api/run-stream"""
+    return json.dumps({'event': event, **fields}) + '\n'
+
+def _prepare_stream_command(language: str, code: str, temp_dir: str):
+    """
+    Write the program into temp_dir (compiling it if needed) and build the command that runs it.
+    Returns (argv, None) on success or (None, error_message).
+    """
+    if language == 'python':
+        source_file = os.path.join(temp_dir, 'program.py')
+        _write_source(source_file, code)
+        return [sys.executable, '-u', source_file], None
+    
+    if language in ('c', 'cpp'):
+        source_file = os.path.join(temp_dir, 'program.c' if language == 'c' else 'program.cpp')
+        exe_file = os.path.join(temp_dir, 'program.exe')
+        _write_source(source_file, code)
+        compiler_cmd = resolve_tool(language, GCC_PATHS if language == 'c' else GPP_PATHS)
+        if not compiler_cmd:
+            return None, f"{'GCC' if language == 'c' else 'G++'} compiler not found!"
+        compile_process = _run_capped(
+            _cc_compile_argv(compiler_cmd, os.path.basename(source_file), 'program.exe'),
+            timeout=30,
+            cwd=temp_dir
+        )
+        if compile_process.returncode != 0:
+            return None, f"🔨 {'C' if language == 'c' else 'C++'} Compilation Error:\n{_decode(compile_process.stderr)}"
+        return [exe_file], None
+    
+    if language == 'go':
+        source_file = os.path.join(temp_dir, 'main.go')
+        _write_source(source_file, code)
+        return ['go', 'run', source_file], None
+    
+    if language == 'php':
+        source_file = os.path.join(temp_dir, 'program.php')
+        _write_source(source_file, code)
+        return ['php', source_file], None
+    
+    if language == 'r':
+        rscript_cmd = resolve_tool('r', RSCRIPT_PATHS)
+        if not rscript_cmd:
+            return None, '❌ R not found!'
+        source_file = os.path.join(temp_dir, 'program.R')
+        _write_source(source_file, _R_READLINE_RE.sub(_r_readline_sub, code))
+        return [rscript_cmd, '--vanilla', '--slave', source_file], None
+    
+    # typescript
+    source_file = os.path.join(temp_dir, 'program.ts')
+    _write_source(source_file, code)
+    return [_TSNODE, source_file], None
+
+# Chunks buffered between the pipe readers and the client; when it is full the readers
+# stop reading, so a program writing faster than the client receives blocks on its pipe
+STREAM_QUEUE_CHUNKS = 16
+
+def _pump_pipe(pipe, name: str, events: queue.Queue, stop: threading.Event):
+    """Reader thread: forward raw chunks from a child pipe until EOF or until stop is set"""
+    with pipe:
+        for chunk in iter(lambda: pipe.read(65536), b''):
+            while not stop.is_set():
+                try:
+                    events.put((name, chunk), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+    events.put((name, None))
+
+def _stream_execution(code: str, language: str, user_inputs: list = None, timeout: float = 30):
+    """
+    Generator that runs a program and yields NDJSON events as output arrives:
+    {"event": "stdout"|"stderr", "data": ...}, then {"event": "exit", "code": ...}
+    or {"event": "error", "message": ...}.
+    """
+    temp_dir = borrow_scratch_dir(language)
+    process = None
+    stop_pumps = threading.Event()
+    try:
+        argv, error = _prepare_stream_command(language, code, temp_dir)
+        if error:
+            yield _stream_event('error', message=error)
+            return
+        
+        process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=not _IS_WIN
+        )
+        
+        # Feed stdin from a thread so a child that writes before reading can't deadlock us
+        input_bytes = _stdin_bytes(user_inputs) or b''
+        def feed_stdin():
+            try:
+                process.stdin.write(input_bytes)
+            except OSError:
+                pass
+            finally:
+                process.stdin.close()
+        threading.Thread(target=feed_stdin, daemon=True).start()
+        
+        # Pipes can't be select()ed on Windows, so each one gets a reader thread
+        events = queue.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+        for name, pipe in (('stdout', process.stdout), ('stderr', process.stderr)):
+            threading.Thread(target=_pump_pipe, args=(pipe, name, events, stop_pumps), daemon=True).start()
+        
+        decoders = {name: codecs.getincrementaldecoder('utf-8')('replace') for name in ('stdout', 'stderr')}
+        sent = {'stdout': 0, 'stderr': 0}
+        open_pipes = 2
+        deadline = time.monotonic() + timeout
+        while open_pipes:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill_proc(process)
+                yield _stream_event('error', message=f'⏱️ Execution timeout: Program took too long to execute (>{timeout} seconds).')
+                return
+            try:
+                name, chunk = events.get(timeout=min(remaining, 0.05))
+            except queue.Empty:
+                continue
+            if chunk is None:
+                open_pipes -= 1
+                text = decoders[name].decode(b'', final=True)
+            else:
+                # Same per-stream limit as the buffered runs
+                chunk = chunk[:OUTPUT_MAX_BYTES - sent[name]]
+                sent[name] += len(chunk)
+                text = decoders[name].decode(chunk)
+            if text:
+                yield _stream_event(name, data=text)
+            if sent[name] >= OUTPUT_MAX_BYTES:
+                _kill_proc(process)
+                yield _stream_event(name, data=_decode(OUTPUT_TRUNCATED_MARKER))
+                yield _stream_event('error', message=f'✂️ Output limit reached: program stopped after {OUTPUT_MAX_BYTES} bytes of {name}.')
+                return
+        
+        yield _stream_event('exit', code=process.wait())
+    
+    except FileNotFoundError as e:
+        yield _stream_event('error', message=f'❌ {language} toolchain not found: {e}')
+    except subprocess.TimeoutExpired:
+        yield _stream_event('error', message='⏱️ Compilation timeout (>30 seconds).')
+    finally:
+        # Also runs when the client disconnects mid-stream. The whole process group is
+        # killed, even after a normal exit: anything the program started (e.g. the
+        # binary `go run` builds) may still be running.
+        stop_pumps.set()
+        if process is not None:
+            _kill_proc(process)
+            process.wait()
+        release_scratch_dir(language, temp_dir)
+
+@app.route('/api/run-stream', methods=['POST'])
+@require_fields('code')
+def run_stream():
+    """
+    Run code and stream its output as newline-delimited JSON events
+    
+    Request body:
+    {
+        "code": "source code here",
+        "language": "python" | "c" | "cpp" | "go" | "php" | "r" | "typescript",
+        "inputs": ["stdin line", ...]
+    }
+    """
+    data = g.payload
+    source_code = data.get('code', '')
+    language = data.get('language', 'python')
+    user_inputs = data.get('inputs', [])
+    
+    if language not in STREAM_LANGUAGES:
+        return ojson({
+            'success': False,
+            'error': f'Streaming not supported for {language}'
+        }, 400)
+    
+    return Response(
+        stream_with_context(_stream_execution(source_code, language, user_inputs)),
+        mimetype='application/x-ndjson'
+    )
 
 @app.route('/api/detect-language', methods=['POST'])
+@require_fields('code')
 def detect_language():
     """
     Detect programming language from code
@@ -913,33 +2168,27 @@ def detect_language():
     }
     """
     try:
-        data = request.get_json()
+        data = g.payload
         source_code = data.get('code', '')
         
-        if not source_code:
-            return jsonify({
-                'success': False,
-                'error': 'No code provided'
-            }), 400
-        
-        from nlp_corrector import NLPErrorCorrector
-        nlp = NLPErrorCorrector()
+        nlp = _NLP
         
         language, confidence = nlp.detect_language(source_code)
         
-        return jsonify({
+        return ojson({
             'success': True,
             'language': language,
             'confidence': f"{confidence * 100:.1f}%"
         })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/correct-syntax', methods=['POST'])
+@require_fields('code')
 def correct_syntax():
     """
     Auto-correct syntax errors using NLP
@@ -951,32 +2200,25 @@ def correct_syntax():
     }
     """
     try:
-        data = request.get_json()
+        data = g.payload
         source_code = data.get('code', '')
         language = data.get('language', 'python')
         
-        if not source_code:
-            return jsonify({
-                'success': False,
-                'error': 'No code provided'
-            }), 400
-        
-        from nlp_corrector import NLPErrorCorrector
-        nlp = NLPErrorCorrector()
+        nlp = _NLP
         
         result = nlp.correct_syntax_errors(source_code, language)
         
-        return jsonify({
+        return ojson({
             'success': True,
             'corrected_code': result['corrected_code'],
             'fixes_applied': result['fixes_applied']
         })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/explain-error', methods=['POST'])
 def explain_error():
@@ -990,27 +2232,27 @@ def explain_error():
     }
     """
     try:
-        data = request.get_json()
+        data = g.payload
         error_message = data.get('error', '')
         context = data.get('context', '')
         
-        from nlp_corrector import NLPErrorCorrector
-        nlp = NLPErrorCorrector()
+        nlp = _NLP
         
         explanation = nlp.explain_error(error_message, context)
         
-        return jsonify({
+        return ojson({
             'success': True,
             'explanation': explanation
         })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/analyze', methods=['POST'])
+@require_fields('code')
 def analyze_code():
     """
     Comprehensive code analysis
@@ -1022,18 +2264,11 @@ def analyze_code():
     }
     """
     try:
-        data = request.get_json()
+        data = g.payload
         source_code = data.get('code', '')
         language = data.get('language', 'python')
         
-        if not source_code:
-            return jsonify({
-                'success': False,
-                'error': 'No code provided'
-            }), 400
-        
-        from nlp_corrector import NLPErrorCorrector
-        nlp = NLPErrorCorrector()
+        nlp = _NLP
         
         # Language detection
         detected_lang, confidence = nlp.detect_language(source_code)
@@ -1041,7 +2276,7 @@ def analyze_code():
         # Generate documentation
         documentation = nlp.generate_code_documentation(source_code, language)
         
-        return jsonify({
+        return ojson({
             'success': True,
             'detected_language': detected_lang,
             'language_confidence': f"{confidence * 100:.1f}%",
@@ -1049,17 +2284,40 @@ def analyze_code():
         })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+# Issues listed in one fallback error analysis
+FALLBACK_MAX_ISSUES = 3
+
+# "line 6" in a chat message
+_LINE_RE = re.compile(r'line\s+(\d+)')
+
+def _line_delimiter_issues(code: str):
+    """
+    Per-line flags for an odd number of quotes and for unbalanced parentheses,
+    computed in a few vectorized passes over the source bytes instead of a Python loop per line
+    """
+    buf = np.frombuffer(code.encode('utf-8', 'replace'), dtype=np.uint8)
+    # Offsets where each line starts; the zero padding keeps a start after a trailing newline in bounds
+    starts = np.concatenate(([0], np.flatnonzero(buf == 0x0A) + 1))
+    buf = np.append(buf, 0)
+    
+    def per_line(char):
+        return np.add.reduceat((buf == ord(char)).astype(np.int32), starts)
+    
+    quotes_odd = (per_line('"') % 2 != 0) | (per_line("'") % 2 != 0)
+    parens_unmatched = per_line('(') != per_line(')')
+    return quotes_odd, parens_unmatched
 
 def get_intelligent_fallback_response(message, language, code):
     """Intelligent rule-based chatbot responses with code analysis"""
     message_lower = message.lower()
     
     # Extract line number if mentioned
-    line_match = re.search(r'line\s+(\d+)', message_lower)
+    line_match = _LINE_RE.search(message_lower)
     target_line = int(line_match.group(1)) if line_match else None
     
     # Error explanations - ANALYZE THE CODE
@@ -1096,17 +2354,20 @@ def get_intelligent_fallback_response(message, language, code):
         
         # General code analysis if no specific line
         else:
-            for i, line in enumerate(lines, 1):
-                if line.strip():
-                    # Check quotes
-                    if line.count('"') % 2 != 0 or line.count("'") % 2 != 0:
-                        issues.append(f"**Line {i}:** Unclosed string quote")
-                    # Check parentheses
-                    if line.count('(') != line.count(')'):
-                        issues.append(f"**Line {i}:** Unmatched parentheses")
+            quotes_odd, parens_unmatched = _line_delimiter_issues(code)
+            # Only the first few issues are shown, so only those lines are formatted
+            for i in np.flatnonzero(quotes_odd | parens_unmatched)[:FALLBACK_MAX_ISSUES]:
+                # Check quotes
+                if quotes_odd[i]:
+                    issues.append(f"**Line {i + 1}:** Unclosed string quote")
+                # Check parentheses
+                if parens_unmatched[i]:
+                    issues.append(f"**Line {i + 1}:** Unmatched parentheses")
+                if len(issues) >= FALLBACK_MAX_ISSUES:
+                    break
         
         if issues:
-            return "🔍 **Error Analysis:**\n\n" + "\n\n".join(issues[:3])  # Show up to 3 issues
+            return "🔍 **Error Analysis:**\n\n" + "\n\n".join(issues[:FALLBACK_MAX_ISSUES])
         else:
             return f"I analyzed your {language} code but didn't find obvious syntax errors. Try:\n\n1. **Run the code** to see the exact error message\n2. Check for **indentation** (Python requires consistent spaces/tabs)\n3. Verify **spelling** of keywords like `print`, `def`, `if`"
     
@@ -1121,29 +2382,49 @@ def get_intelligent_fallback_response(message, language, code):
     # General help
     return f"I'm your {language} coding assistant! I can help with:\n\n• Explaining errors (try: 'what's wrong with line 6?')\n• Syntax questions\n• Debugging tips\n• Best practices\n\nAsk me about any specific line!"
 
+def _chat_event_stream(system_prompt: str, cache_key: bytes = None, scope: tuple = None, embedding=None):
+    """
+    Stream a Gemini answer as server-sent events: one event per text chunk,
+    then a `done` event (or `error`). The full answer is cached under cache_key.
+    """
+    parts = []
+    try:
+        for chunk in gemini_model.generate_content(system_prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # Chunk without text parts (e.g. only a finish reason)
+            if text:
+                parts.append(text)
+                yield f"data: {json.dumps({'text': text})}\n\n"
+    except Exception as e:
+        print(f"❌ Gemini API Error: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        return
+    
+    # An empty answer (e.g. a blocked response) would be served from the cache forever
+    if cache_key is not None and parts:
+        _remember_chat_answer(cache_key, scope, embedding, ''.join(parts))
+    yield f"event: done\ndata: {json.dumps({'source': 'gemini-2.5-flash'})}\n\n"
+
 @app.route('/api/chat', methods=['POST'])
+@require_fields('message')
 def chat():
     """
     AI-powered chatbot using Google Gemini
     Helps with coding questions and debugging
     """
     try:
-        data = request.get_json()
+        data = g.payload
         message = data.get('message', '')
         code = data.get('code', '')
         language = data.get('language', 'python')
         
-        if not message:
-            return jsonify({
-                'success': False,
-                'error': 'No message provided'
-            }), 400
-        
         # Check if Gemini is available
         if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
             # Use intelligent fallback response
             fallback_response = get_intelligent_fallback_response(message, language, code)
-            return jsonify({
+            return ojson({
                 'success': True,
                 'response': fallback_response,
                 'source': 'fallback'
@@ -1151,24 +2432,46 @@ def chat():
         
         try:
             # Build context-aware prompt
-            system_prompt = f"""You are an expert programming assistant helping with {language} code.
-Be concise, clear, and provide practical solutions.
+            # (static instructions live in CHAT_SYSTEM_INSTRUCTION)
+            system_prompt = f"""Help with this {language} code.
 
 Current Code Context:
 ```{language}
 {code[:500] if code else 'No code provided'}
 ```
 
-User Question: {message}
-
-Provide a helpful, actionable response. If suggesting code changes, use proper formatting."""
+User Question: {message}"""
+            
+            # Answer from cache when the same (or a near-identical) question was already asked
+            cache_key = _chat_cache_key(message, code, language)
+            scope = _chat_cache_scope(code, language)
+            cached_response, embedding = (
+                _cached_chat_answer(cache_key, message, scope) if cache_key is not None else (None, None)
+            )
+            if cached_response is not None:
+                return ojson({
+                    'success': True,
+                    'response': cached_response,
+                    'source': 'gemini-2.5-flash',
+                    'cached': True
+                })
+            
+            # Clients that accept server-sent events get the answer as it is generated
+            if 'text/event-stream' in request.headers.get('Accept', ''):
+                return Response(
+                    stream_with_context(_chat_event_stream(system_prompt, cache_key, scope, embedding)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+                )
             
             # Generate response using Gemini
-            response = gemini_model.generate_content(system_prompt)
+            response_text = chat_batcher.submit(system_prompt).result(timeout=60)
+            if cache_key is not None and response_text:
+                _remember_chat_answer(cache_key, scope, embedding, response_text)
             
-            return jsonify({
+            return ojson({
                 'success': True,
-                'response': response.text,
+                'response': response_text,
                 'source': 'gemini-2.5-flash'
             })
             
@@ -1179,7 +2482,7 @@ Provide a helpful, actionable response. If suggesting code changes, use proper f
             traceback.print_exc()
             
             # Fallback to basic response
-            return jsonify({
+            return ojson({
                 'success': True,
                 'response': f"I'm having trouble connecting to AI services. However, I can help with basic questions about {language} programming. Could you rephrase your question?",
                 'source': 'fallback',
@@ -1187,15 +2490,15 @@ Provide a helpful, actionable response. If suggesting code changes, use proper f
             })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return ojson({
         'status': 'healthy',
         'version': '1.0.0',
         'features': [
@@ -1208,25 +2511,59 @@ def health_check():
         ]
     })
 
+# Front-end files, resolved once at startup: relative URL path -> absolute file path
+STATIC_EXTENSIONS = ('.html', '.css', '.js', '.png', '.jpg', '.jpeg', '.svg', '.ico')
+STATIC_CACHE_SECONDS = 3600
+# The page and its scripts change together with the API on every deploy, so browsers
+# revalidate them each load (a cheap 304 thanks to the ETag) instead of caching them
+STATIC_REVALIDATE_EXTENSIONS = ('.html', '.js')
+
+def _build_static_map() -> dict:
+    root = os.path.dirname(os.path.abspath(__file__))
+    static_map = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in ('__pycache__', 'node_modules')]
+        for filename in filenames:
+            if filename.endswith(STATIC_EXTENSIONS) and filename != os.path.basename(TS_WORKER_SOURCE):
+                full_path = os.path.join(dirpath, filename)
+                static_map[os.path.relpath(full_path, root).replace(os.sep, '/')] = full_path
+    return static_map
+
+_STATIC_MAP = _build_static_map()
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Let browsers reuse front-end files instead of re-fetching them on every page load"""
+    if request.endpoint in ('index', 'serve_static') and response.status_code in (200, 304):
+        if request.endpoint == 'index' or request.path.endswith(STATIC_REVALIDATE_EXTENSIONS):
+            response.headers['Cache-Control'] = 'no-cache'
+        else:
+            response.headers['Cache-Control'] = f'public, max-age={STATIC_CACHE_SECONDS}'
+    return response
+
 @app.route('/', methods=['GET'])
 def index():
     """Serve the main HTML page"""
-    return send_from_directory('.', 'index.html')
+    return serve_static('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
     """Serve static files (CSS, JS, images)"""
-    return send_from_directory('.', path)
+    full_path = _STATIC_MAP.get(path)
+    if full_path is None:
+        abort(404)
+    return send_file(full_path, conditional=True)
 
 @app.route('/api', methods=['GET'])
 def api_docs():
     """API documentation"""
-    return jsonify({
+    return ojson({
         'name': 'AI/ML Compiler API',
         'version': '1.0.0',
         'endpoints': {
             '/api/compile': 'POST - Compile code with AI/ML enhancements',
-            '/api/chat': 'POST - AI-powered coding assistant (Gemini)',
+            '/api/run-stream': 'POST - Run code and stream output (NDJSON)',
+            '/api/chat': 'POST - AI-powered coding assistant (Gemini); send Accept: text/event-stream to stream the answer',
             '/api/detect-language': 'POST - Detect programming language',
             '/api/correct-syntax': 'POST - Auto-correct syntax errors',
             '/api/explain-error': 'POST - Get human-friendly error explanations',
@@ -1235,9 +2572,25 @@ def api_docs():
         }
     })
 
+# Request threads for waitress; compile/run requests mostly wait on child processes
+WAITRESS_THREADS = int(os.environ.get('WAITRESS_THREADS', 16))
+
 if __name__ == '__main__':
     print("🚀 Starting AI/ML Compiler API Server...")
     port = int(os.environ.get('PORT', 5000))
     print(f"📝 API Documentation: http://localhost:{port}/")
     print(f"🔍 Health Check: http://localhost:{port}/api/health")
-    app.run(debug=False, host='0.0.0.0', port=port, use_reloader=False)
+    
+    # Production-grade threaded server for direct `python api_server.py` runs
+    # (gunicorn, see wsgi.py, has no Windows support; waitress does)
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    
+    if serve is not None and not debug:
+        print(f"🧵 Serving with waitress ({WAITRESS_THREADS} threads)")
+        serve(app, host='0.0.0.0', port=port, threads=WAITRESS_THREADS)
+    else:
+        app.run(debug=debug, host='0.0.0.0', port=port, use_reloader=False, threaded=True)
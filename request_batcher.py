@@ -0,0 +1,86 @@
+"""
+Request Micro-Batcher
+Collects requests that arrive within a short window and dispatches them together
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List
+
+class MicroBatcher:
+    """
+    Runs an async call on a background event loop for callers in ordinary threads.
+    Requests arriving within `window` seconds (up to `max_batch`) form one batch;
+    identical keys in a batch share a single call and all calls are issued concurrently.
+    """
+
+    def __init__(self, call: Callable[[Any], Awaitable[Any]], max_batch: int = 16, window: float = 0.025):
+        self.call = call
+        self.max_batch = max_batch
+        self.window = window
+        self._loop = None
+        self._queue = None
+        self._tasks = set()  # Strong references so in-flight calls are not garbage collected
+        self._start_lock = threading.Lock()
+
+    def submit(self, key) -> Future:
+        """Queue a request; the returned future resolves with the call's result"""
+        self._ensure_started()
+        future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (key, future))
+        return future
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            started = threading.Event()
+            threading.Thread(target=self._run_loop, args=(started,), daemon=True, name='micro-batcher').start()
+            started.wait()
+
+    def _run_loop(self, started: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        self._loop = loop
+        started.set()
+        loop.run_until_complete(self._worker())
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+
+            # Keep collecting until the batch is full or the window closes
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.005))
+
+            waiters: Dict[Any, List[Future]] = {}
+            for key, future in batch:
+                waiters.setdefault(key, []).append(future)
+
+            for key, futures in waiters.items():
+                task = self._loop.create_task(self._dispatch(key, futures))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, key, futures: List[Future]):
+        try:
+            result = await self.call(key)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
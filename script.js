@@ -1964,6 +1964,7 @@ async function sendChatMessage() {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                'Accept': 'text/event-stream, application/json',
             },
             body: JSON.stringify({
                 message: message,
@@ -1972,6 +1973,13 @@ async function sendChatMessage() {
             })
         });
         
+        // Live Gemini answers arrive as server-sent events, everything else as JSON
+        const contentType = response.headers.get('Content-Type') || '';
+        if (contentType.includes('text/event-stream')) {
+            await renderChatStream(response, typingDiv);
+            return;
+        }
+        
         const data = await response.json();
         
         // Remove typing indicator
@@ -1986,7 +1994,7 @@ async function sendChatMessage() {
             
             // Add source indicator
             if (data.source === 'gemini-2.5-flash') {
-                aiResponse += '\n\n<div style="text-align: center; color: #888; font-size: 0.85em; margin-top: 10px;">✨ Powered by Google Gemini 2.5 Flash</div>';
+                aiResponse += GEMINI_BADGE;
             }
             
             addChatMessage(aiResponse, 'bot', true); // Pass true for HTML rendering
@@ -2004,6 +2012,65 @@ async function sendChatMessage() {
     }
 }
 
+const GEMINI_BADGE = '\n\n<div style="text-align: center; color: #888; font-size: 0.85em; margin-top: 10px;">✨ Powered by Google Gemini 2.5 Flash</div>';
+
+// Show a streamed chat answer, re-rendering the message as each chunk arrives
+async function renderChatStream(response, typingDiv) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+    let contentDiv = null;
+    let failed = false;
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let payload = '';
+            for (const line of rawEvent.split('\n')) {
+                if (line.startsWith('event: ')) {
+                    eventName = line.slice(7);
+                } else if (line.startsWith('data: ')) {
+                    payload += line.slice(6);
+                }
+            }
+            const data = JSON.parse(payload);
+            
+            if (eventName === 'error') {
+                failed = true;
+            } else if (eventName === 'done') {
+                if (contentDiv && data.source === 'gemini-2.5-flash') {
+                    contentDiv.innerHTML = formatMarkdownCodeBlocks(answer) + GEMINI_BADGE;
+                }
+            } else {
+                answer += data.text;
+                if (!contentDiv) {
+                    typingDiv.remove();
+                    contentDiv = addChatMessage('', 'bot', true);
+                }
+                contentDiv.innerHTML = formatMarkdownCodeBlocks(answer);
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            }
+        }
+    }
+    
+    if (!contentDiv) {
+        typingDiv.remove();
+        addChatMessage("I'm having trouble connecting to AI services. Please try again.", 'bot', false);
+    } else if (failed) {
+        contentDiv.innerHTML += '<br><br>⚠️ The response was interrupted.';
+    }
+}
+
 function addChatMessage(text, sender, isHTML = false) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `chat-message ${sender}-message`;
@@ -2023,6 +2090,8 @@ function addChatMessage(text, sender, isHTML = false) {
     
     // Auto-scroll to bottom
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    
+    return contentDiv;
 }
 
 function getIntelligentBotResponse(question) {
@@ -0,0 +1,86 @@
+"""
+Semantic Response Cache
+Reuses chatbot answers for prompts that mean the same thing
+"""
+
+import threading
+from typing import Optional
+
+# Embedding model is optional - without it the cache never hits
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+class SemanticCache:
+    """
+    Embedding-based cache: a question close enough to an earlier one reuses its response.
+    Entries are grouped by a scope (e.g. language and code context); a lookup only
+    matches entries from its own scope.
+    """
+
+    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+                 threshold: float = 0.92, max_entries: int = 1024):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = SEMANTIC_CACHE_AVAILABLE
+        self._model = None
+        self._matrix = None   # L2-normalized embeddings, one row per entry
+        self._entries = []    # (scope, response) pairs, parallel to the matrix rows
+        self._lock = threading.Lock()
+
+    def embed(self, text: str):
+        """
+        Embed text as a unit-length vector, loading the model on first use.
+        Returns None when the cache is disabled. Keep text short: the model only
+        reads the first 256 word pieces.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            with self._lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(self.model_name)
+            return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+        except Exception as e:
+            self.enabled = False
+            print(f"⚠️ Semantic cache disabled: {e}")
+            return None
+
+    def get(self, embedding, scope) -> Optional[str]:
+        """Return the cached response for the most similar entry in scope, if it is similar enough"""
+        if embedding is None:
+            return None
+
+        with self._lock:
+            if self._matrix is None:
+                return None
+            in_scope = np.fromiter((entry[0] == scope for entry in self._entries), dtype=bool, count=len(self._entries))
+            if not in_scope.any():
+                return None
+            # Rows and query are normalized, so the dot product is the cosine similarity
+            scores = np.where(in_scope, self._matrix @ embedding, -1.0)
+            best = int(np.argmax(scores))
+            if scores[best] > self.threshold:
+                return self._entries[best][1]
+        return None
+
+    def put(self, embedding, scope, response: str):
+        """Remember a response under an embedding from embed(), evicting the oldest entry when full"""
+        if embedding is None:
+            return
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = embedding[np.newaxis, :]
+            else:
+                self._matrix = np.vstack([self._matrix, embedding])
+            self._entries.append((scope, response))
+
+            if len(self._entries) > self.max_entries:
+                self._matrix = self._matrix[1:]
+                self._entries.pop(0)
@@ -0,0 +1,89 @@
+"""
+Tests for in-process Python execution in api_server.py
+Run with: python -m unittest test_execute_python
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from api_server import _execute_code
+
+# Catches the timeout and carries on looping, trying to keep the request thread
+SWALLOWS_TIMEOUT = (
+    'import time\n'
+    'while True:\n'
+    '    try:\n'
+    '        while True: time.sleep(0.01)\n'
+    '    except BaseException:\n'
+    '        pass\n'
+)
+
+
+class ConcurrentPythonTests(unittest.TestCase):
+    def test_concurrent_runs_capture_only_their_own_output(self):
+        jobs = 8
+        results = [None] * jobs
+        start = threading.Barrier(jobs)
+
+        def run(job):
+            code = (
+                'import time\n'
+                'for i in range(20):\n'
+                f'    print("job {job}")\n'
+                '    time.sleep(0.005)\n'
+            )
+            start.wait()
+            results[job] = _execute_code(code, 'python')
+
+        threads = [threading.Thread(target=run, args=(job,)) for job in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for job, result in enumerate(results):
+            self.assertEqual(result['status'], 'success', result)
+            self.assertEqual(result['output'], f'job {job}\n' * 20)
+
+
+@mock.patch('api_server.PYTHON_EXEC_TIMEOUT', 1)
+class PythonTimeoutTests(unittest.TestCase):
+    def check_stopped(self, result):
+        self.assertEqual(result['status'], 'error', result)
+        self.assertIn('(>1 seconds)', ''.join(result['errors']))
+
+    def check_stops(self, code):
+        start = time.monotonic()
+        result = _execute_code(code, 'python')
+        self.assertLess(time.monotonic() - start, 5)
+        self.check_stopped(result)
+
+    def run_on_worker_thread(self, code):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(_execute_code(code, 'python')), daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive(), 'user code kept the thread past its deadline')
+        self.check_stopped(results[0])
+
+    def test_main_thread_timeout(self):
+        self.check_stops('while True: pass\n')
+
+    def test_main_thread_timeout_swallowed(self):
+        self.check_stops(SWALLOWS_TIMEOUT)
+
+    def test_worker_thread_timeout(self):
+        self.run_on_worker_thread('while True: pass\n')
+
+    def test_worker_thread_timeout_swallowed(self):
+        self.run_on_worker_thread(SWALLOWS_TIMEOUT)
+
+    def test_runs_normally_after_timeout(self):
+        self.check_stops(SWALLOWS_TIMEOUT)
+        self.assertEqual(_execute_code('print("ok")\n', 'python')['output'], 'ok\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
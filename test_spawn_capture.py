@@ -0,0 +1,115 @@
+"""
+Tests for the child-process capture helpers in api_server.py
+Run with: python -m unittest test_spawn_capture
+"""
+
+import io
+import signal
+import struct
+import subprocess
+import sys
+import time
+import unittest
+
+from api_server import _spawn_capture, _run_capped, _read_frame, OUTPUT_TRUNCATED_MARKER
+
+# Parent that starts a grandchild holding the same stdout, then exits, like `go run`
+SPAWNS_CHATTY_CHILD = (
+    'import subprocess, sys; '
+    'subprocess.Popen([sys.executable, "-c", "while True: print(\'x\' * 1000)"]); '
+    'import time; time.sleep(30)'
+)
+SPAWNS_SLEEPING_CHILD = (
+    'import subprocess, sys; '
+    'subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])'
+)
+
+
+def py(source: str) -> list:
+    """argv that runs a Python snippet in a child interpreter"""
+    return [sys.executable, '-c', source]
+
+
+class SpawnCaptureTests(unittest.TestCase):
+    def test_captures_stdout_stderr_and_exit_code(self):
+        result = _spawn_capture(py('import sys; print("out"); print("err", file=sys.stderr); sys.exit(3)'))
+        self.assertEqual(result.stdout, b'out\n')
+        self.assertEqual(result.stderr, b'err\n')
+        self.assertEqual(result.returncode, 3)
+
+    def test_feeds_stdin(self):
+        data = b'line\n' * 50_000  # More than a pipe buffer
+        result = _spawn_capture(py('import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())'), data)
+        self.assertEqual(result.stdout, data)
+
+    def test_no_stdin_reads_eof(self):
+        result = _spawn_capture(py('import sys; print(repr(sys.stdin.read()))'))
+        self.assertEqual(result.stdout, b"''\n")
+
+    def test_timeout(self):
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            _spawn_capture(py('import time; time.sleep(30)'), timeout=1)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_timeout_after_closing_output(self):
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            _spawn_capture(py('import os, time; os.close(1); os.close(2); time.sleep(30)'), timeout=1)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_output_cap_truncates_and_kills(self):
+        start = time.monotonic()
+        result = _spawn_capture(py('while True: print("x" * 1000)'), max_bytes=10_000, timeout=10)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(result.stdout.endswith(OUTPUT_TRUNCATED_MARKER))
+        self.assertEqual(len(result.stdout), 10_000 + len(OUTPUT_TRUNCATED_MARKER))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'reads /proc')
+    def test_child_gets_default_sigpipe(self):
+        # The Python test runner ignores SIGPIPE; the child must not inherit that
+        result = _spawn_capture(['grep', 'SigIgn', '/proc/self/status'])
+        ignored = int(result.stdout.split()[1], 16)
+        self.assertFalse(ignored & (1 << (signal.SIGPIPE - 1)))
+        self.assertFalse(ignored & (1 << (signal.SIGXFSZ - 1)))
+
+
+class ProcessGroupTests(unittest.TestCase):
+    """Both capture helpers must stop programs the child started, not just the child"""
+
+    def check_truncation_kills_grandchild(self, capture):
+        start = time.monotonic()
+        result = capture(py(SPAWNS_CHATTY_CHILD), max_bytes=10_000, timeout=20)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(result.stdout.endswith(OUTPUT_TRUNCATED_MARKER))
+
+    def check_timeout_kills_grandchild(self, capture):
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            capture(py(SPAWNS_SLEEPING_CHILD), timeout=1)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_spawn_capture_truncation(self):
+        self.check_truncation_kills_grandchild(_spawn_capture)
+
+    def test_spawn_capture_timeout(self):
+        self.check_timeout_kills_grandchild(_spawn_capture)
+
+    def test_run_capped_truncation(self):
+        self.check_truncation_kills_grandchild(_run_capped)
+
+    def test_run_capped_timeout(self):
+        self.check_timeout_kills_grandchild(_run_capped)
+
+
+class ReadFrameTests(unittest.TestCase):
+    def test_reads_frame(self):
+        self.assertEqual(_read_frame(io.BytesIO(struct.pack('>i', 3) + b'abc'), 3), b'abc')
+
+    def test_rejects_oversized_frame(self):
+        with self.assertRaises(ValueError):
+            _read_frame(io.BytesIO(struct.pack('>i', 4) + b'abcd'), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
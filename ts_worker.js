@@ -0,0 +1,225 @@
+/**
+ * Long-lived Node.js worker used by api_server.py to type-check and run
+ * TypeScript without paying node + ts-node startup on every request.
+ * The TypeScript compiler and the parsed lib.*.d.ts files stay in memory
+ * between runs, which is where most of ts-node's startup time goes.
+ *
+ * Protocol over stdin/stdout: every message is a big-endian uint32 length
+ * followed by that many bytes of UTF-8 JSON.
+ *   request:  {"code": "...", "timeout": 10000, "maxBytes": 1048576}
+ *   response: {"status": "ok" | "runtime_error" | "compile_error" | "timeout" | "unavailable" | "fallback",
+ *              "stdout": "...", "stderr": "..."}
+ *
+ * Only synchronous programs are run here; api_server.py sends anything that
+ * reads stdin or uses timers to ts-node. Every object user code can reach is
+ * created inside its vm context: a host object would hand it the host Function
+ * constructor (`obj.constructor.constructor('return process')()`), and with it
+ * the protocol pipe and the worker's state for later requests.
+ * The sandbox has little beyond the ECMAScript built-ins and a console, and a
+ * ReferenceError/TypeError may just mean it lacks something Node has, so those
+ * answer "fallback" and api_server.py reruns the program in ts-node.
+ *
+ * Run with: node ts_worker.js
+ */
+'use strict';
+
+const path = require('path');
+const util = require('util');
+const vm = require('vm');
+const { execSync } = require('child_process');
+
+function loadTypeScript() {
+    try {
+        return require('typescript');
+    } catch (e) {
+        // Usually installed globally with `npm install -g typescript`
+        try {
+            const globalRoot = execSync('npm root -g', { encoding: 'utf8', stdio: ['ignore', 'pipe', 'ignore'] }).trim();
+            return require(path.join(globalRoot, 'typescript'));
+        } catch (e2) {
+            return null;
+        }
+    }
+}
+
+const ts = loadTypeScript();
+
+const FILE_NAME = path.resolve('program.ts');
+
+const COMPILER_OPTIONS = ts && {
+    target: ts.ScriptTarget.ES2020,
+    module: ts.ModuleKind.CommonJS,
+    noEmitOnError: true,
+};
+
+const FORMAT_HOST = ts && {
+    getCanonicalFileName: (fileName) => fileName,
+    getCurrentDirectory: () => process.cwd(),
+    getNewLine: () => '\n',
+};
+
+// Parsed default library files, shared by every program
+const libSourceFiles = new Map();
+
+function compile(code) {
+    const host = ts.createCompilerHost(COMPILER_OPTIONS);
+    const readSourceFile = host.getSourceFile;
+    let output = '';
+
+    host.getSourceFile = (fileName, languageVersion, onError) => {
+        if (path.resolve(fileName) === FILE_NAME) {
+            return ts.createSourceFile(fileName, code, languageVersion);
+        }
+        let sourceFile = libSourceFiles.get(fileName);
+        if (!sourceFile) {
+            sourceFile = readSourceFile.call(host, fileName, languageVersion, onError);
+            if (sourceFile) {
+                libSourceFiles.set(fileName, sourceFile);
+            }
+        }
+        return sourceFile;
+    };
+    host.fileExists = (fileName) => path.resolve(fileName) === FILE_NAME || ts.sys.fileExists(fileName);
+    host.readFile = (fileName) => (path.resolve(fileName) === FILE_NAME ? code : ts.sys.readFile(fileName));
+    host.writeFile = (fileName, text) => {
+        if (fileName.endsWith('.js')) {
+            output = text;
+        }
+    };
+
+    const program = ts.createProgram([FILE_NAME], COMPILER_OPTIONS, host);
+    const diagnostics = ts.getPreEmitDiagnostics(program);
+    if (diagnostics.length > 0) {
+        return { errors: ts.formatDiagnostics(diagnostics, FORMAT_HOST) };
+    }
+    program.emit();
+    return { js: output };
+}
+
+// Stack trace of an error thrown by user code, without the worker's own frames
+function userStack(e) {
+    const stack = e && e.stack ? e.stack : String(e);
+    const cut = stack.indexOf('\n    at Script.runInContext');
+    return cut === -1 ? stack : stack.slice(0, cut);
+}
+
+// Evaluated inside each program's context to create its globals. The only host
+// value it gets is `write`, kept in this closure; it is passed and returns only
+// primitives, so user code never holds a host object.
+const CONTEXT_SETUP = `(function (write) {
+    'use strict';
+    class OutputLimitExceeded extends Error {}
+    // Writing past the output limit throws into the program, so a runaway
+    // print loop stops instead of filling memory
+    const print = (stream) => function (...args) {
+        if (!write(stream, args)) {
+            throw new OutputLimitExceeded('output limit exceeded');
+        }
+    };
+    globalThis.console = {
+        log: print('stdout'), info: print('stdout'), debug: print('stdout'),
+        error: print('stderr'), warn: print('stderr'),
+    };
+    globalThis.module = { exports: {} };
+    globalThis.exports = globalThis.module.exports;
+})`;
+
+// Custom inspect functions are called with host objects, so they stay off
+const INSPECT_OPTIONS = { customInspect: false };
+
+// Appended to a captured stream that hit its size limit (same as api_server.py)
+const TRUNCATED_MARKER = '\n[output truncated]';
+
+// Console stream that keeps up to maxBytes of output; write() returns false once it is full
+function collector(maxBytes) {
+    const sink = { chunks: [], bytes: 0, truncated: false };
+    sink.write = (text) => {
+        if (sink.truncated) {
+            return false;
+        }
+        const data = Buffer.from(text, 'utf8');
+        if (sink.bytes + data.length > maxBytes) {
+            sink.chunks.push(data.subarray(0, maxBytes - sink.bytes), Buffer.from(TRUNCATED_MARKER));
+            sink.truncated = true;
+            return false;
+        }
+        sink.chunks.push(data);
+        sink.bytes += data.length;
+        return true;
+    };
+    sink.text = () => Buffer.concat(sink.chunks).toString('utf8');
+    return sink;
+}
+
+function execute(js, timeout, maxBytes) {
+    const stdout = collector(maxBytes);
+    const stderr = collector(maxBytes);
+    const write = (stream, args) => (stream === 'stderr' ? stderr : stdout)
+        .write(Reflect.apply(util.formatWithOptions, null, [INSPECT_OPTIONS, ...args]) + '\n');
+    // A null-prototype sandbox: even a plain {} would leak Object.prototype.constructor
+    const context = vm.createContext(Object.create(null));
+    vm.runInContext(CONTEXT_SETUP, context)(write);
+
+    let status = 'ok';
+    try {
+        vm.runInContext(js, context, { filename: 'program.js', timeout });
+    } catch (e) {
+        if (e && e.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+            status = 'timeout';
+        } else if (stdout.truncated || stderr.truncated) {
+            status = 'runtime_error';
+        } else if (e && (e.name === 'ReferenceError' || e.name === 'TypeError')) {
+            return { status: 'fallback', stdout: '', stderr: '' };
+        } else {
+            status = 'runtime_error';
+            stderr.chunks.push(Buffer.from(userStack(e) + '\n', 'utf8'));
+        }
+    }
+    if (status === 'ok' && (stdout.truncated || stderr.truncated)) {
+        // The program caught the output limit error and finished anyway
+        status = 'runtime_error';
+    }
+    return { status, stdout: stdout.text(), stderr: stderr.text() };
+}
+
+function handle(request) {
+    if (!ts) {
+        return { status: 'unavailable', stdout: '', stderr: 'typescript module not found' };
+    }
+    const compiled = compile(request.code);
+    if (compiled.errors) {
+        return { status: 'compile_error', stdout: '', stderr: compiled.errors };
+    }
+    return execute(compiled.js, request.timeout || 10000, request.maxBytes || 1048576);
+}
+
+function reply(message) {
+    const body = Buffer.from(JSON.stringify(message), 'utf8');
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(body.length, 0);
+    process.stdout.write(Buffer.concat([header, body]));
+}
+
+let pending = Buffer.alloc(0);
+
+process.stdin.on('data', (chunk) => {
+    pending = Buffer.concat([pending, chunk]);
+    while (pending.length >= 4) {
+        const length = pending.readUInt32BE(0);
+        if (pending.length < 4 + length) {
+            break;
+        }
+        const body = pending.subarray(4, 4 + length);
+        pending = pending.subarray(4 + length);
+
+        let response;
+        try {
+            response = handle(JSON.parse(body.toString('utf8')));
+        } catch (e) {
+            response = { status: 'runtime_error', stdout: '', stderr: String(e && e.stack ? e.stack : e) + '\n' };
+        }
+        reply(response);
+    }
+});
+
+process.stdin.on('end', () => process.exit(0));
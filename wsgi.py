@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers
+
+Run with a threaded gunicorn worker so blocking compile/run subprocesses
+from different clients overlap:
+    gunicorn -k gthread -w $(nproc) --threads 8 -b 0.0.0.0:5000 wsgi:application
+"""
+
+from api_server import app
+
+application = app